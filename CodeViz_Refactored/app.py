@@ -85,9 +85,9 @@ class CodeVizApp(ctk.CTk):
         # ========== Screens ==========
         self.frames = {
             "Home": HomePage(self.main_area, self.controller),
-            "Concepts": ConceptsPage(self.main_area),
-            "Learning Module": LearningModulePage(self.main_area),
-            "Applications": ApplicationsPage(self.main_area),
+            "Concepts": ConceptsPage(self.main_area, self.controller.db_path),
+            "Learning Module": LearningModulePage(self.main_area, self.controller.db_path),
+            "Applications": ApplicationsPage(self.main_area, self.controller.db_path),
             "Settings": SettingsPage(self.main_area),
             "User Manual": UserManualPage(self.main_area),
             "Profile": ProfilePage(self.main_area),
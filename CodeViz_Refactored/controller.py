@@ -1,4 +1,6 @@
+import threading
 import time
+from utils.db_utils import DB_PATH, close_connections, migrate
 
 class AppController:
     """
@@ -23,6 +25,17 @@ class AppController:
     def __init__(self):
         self.session_start = time.time()
         self.last_tab = "Home"
+        self.db_path = DB_PATH
+        # Import changed flat files into the content store without holding up the first window
+        threading.Thread(target=self.migrate_store, daemon=True).start()
+
+    def migrate_store(self):
+        try:
+            migrate(self.db_path)
+        except Exception as e:
+            print(f"Content store migration failed: {e}")
+        finally:
+            close_connections()
 
     def get_session_duration_minutes(self):
         return int((time.time() - self.session_start) / 60)
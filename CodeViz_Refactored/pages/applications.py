@@ -1,132 +1,56 @@
 import customtkinter as ctk
+import json
+import threading
+from utils.db_utils import APPLICATIONS_PATH, DB_PATH, close_connections, fetch_applications, migrate
+
+# Offered in the filter even before any card uses them, in this order
+CATEGORIES = ["Basics", "Control Flow", "Data Structures", "Memory", "Advanced"]
 
 # 📚 Application Data
-APPLICATION_DATA = [
-    {
-        "title": "📦 Arrays",
-        "category": "Basics",
-        "difficulty": "Beginner",
-        "use": "Used in shopping carts, sensor data tracking, and image processing.",
-        "why": "To store multiple elements of the same type in contiguous memory.",
-        "helpful": "Efficient for indexing, traversing, sorting, and searching.",
-        "project": "Create a Mini Inventory Tracker for a grocery shop."
-    },
-    {
-        "title": "🔁 Loops",
-        "category": " Control Flow",
-        "difficulty": "Beginner",
-        "use": "Used in loading animations, simulation programs, and menu-based apps.",
-        "why": "To execute a set of statements repeatedly based on a condition.",
-        "helpful": "Reduces code repetition, improves control and logic building.",
-        "project": "Create a Pattern Printer or a Number Guessing Game."
-    },
-    {
-        "title": "🧮 Functions",
-        "category": "Basics",
-        "difficulty": "Beginner",
-        "use": "Used in calculators, banking systems, and modular programs.",
-        "why": "Breaks down complex logic into manageable chunks.",
-        "helpful": "Increases reusability, readability, and debugging ease.",
-        "project": "Build a Scientific Calculator with multiple operations."
-    },
-    {
-        "title": "📂 File Handling",
-        "category": "Memory",
-        "difficulty": "Intermediate",
-        "use": "Used in text editors, log systems, and saving game progress.",
-        "why": "Allows data persistence beyond runtime.",
-        "helpful": "You can store and retrieve user-generated data easily.",
-        "project": "Create a File-based To-Do List or Student Record System."
-    },
-    {
-        "title": "🎯 Conditionals",
-        "category": "Control Flow",
-        "difficulty": "Beginner",
-        "use": "Used in authentication systems, sorting logic, and decision apps.",
-        "why": "Controls flow of execution based on conditions.",
-        "helpful": "Essential for logic branching and decision-making.",
-        "project": "Build a Login System or a Menu-Driven Calculator."
-    },
-    {
-        "title": "🧵 Pointers",
-        "category": "Memory",
-        "difficulty": "Advanced",
-        "use": "Used in memory managers, linked lists, and system-level programs.",
-        "why": "Allows direct memory access and dynamic memory allocation.",
-        "helpful": "Used to build flexible data structures like trees and graphs.",
-        "project": "Create a Custom String Manipulator using pointers."
-    },
-    {
-        "title": "🧱 Structures",
-        "category": " Data Structures",
-        "difficulty": "Intermediate",
-        "use": "Used in student databases, employee records, and gaming profiles.",
-        "why": "To group related variables (data of different types) together.",
-        "helpful": "Enables object-like data modeling.",
-        "project": "Design a Resume Builder or Employee Management System."
-    },
-    {
-        "title": "📶 Recursion",
-        "category": "Advanced",
-        "difficulty": "Advanced",
-        "use": "Used in problem-solving (factorials, Fibonacci, backtracking).",
-        "why": "Solves problems by breaking them into smaller sub-problems.",
-        "helpful": "Ideal for tree traversal, mathematical algorithms, etc.",
-        "project": "Create a Tower of Hanoi simulator or Maze Solver."
-    },
-    {
-        "title": "🔍 Searching",
-        "category": "Basics",
-        "difficulty": "Intermediate",
-        "use": "Used in search engines, contact lookup, and inventory checks.",
-        "why": "Helps find data efficiently in a large dataset.",
-        "helpful": "Binary search is fast for sorted data; linear for unsorted.",
-        "project": "Build a Library Book Finder using search logic."
-    },
-    {
-        "title": "📊 Sorting",
-        "category": "Basics",
-        "difficulty": "Intermediate",
-        "use": "Used in leaderboards, billing systems, and analytics.",
-        "why": "Sorts data to make search and analysis easier.",
-        "helpful": "Fundamental in data processing and organization.",
-        "project": "Create a Student Marks Sorter (bubble, selection, quick sort)."
-    },
-    {
-        "title": "📈 Dynamic Memory",
-        "category": "Memory",
-        "difficulty": "Advanced",
-        "use": "Used in real-time systems with uncertain memory size.",
-        "why": "Allocates memory during runtime as needed.",
-        "helpful": "Avoids wastage and handles variable-size data.",
-        "project": "Create a Dynamic Array or Memory Usage Visualizer."
-    },
-    {
-        "title": "🔗 Linked Lists",
-        "category": "Data Structures",
-        "difficulty": "Intermediate",
-        "use": "Used in undo features, browser history, and playlist queues.",
-        "why": "Allows dynamic memory use and easier insertion/deletion.",
-        "helpful": "More flexible than arrays in data insertion/removal.",
-        "project": "Build a Singly Linked List App with add/delete/search."
-    }
-]
+with open(APPLICATIONS_PATH, "r", encoding="utf-8") as f:
+    APPLICATION_DATA = json.load(f)
 
 
 class ApplicationsPage(ctk.CTkFrame):
-    def __init__(self, parent):
+    def __init__(self, parent, db_path=DB_PATH):
         super().__init__(parent)
-        self.filtered_data = APPLICATION_DATA.copy()
+        self.db_path = db_path
+        # The built-in cards until the content store, which also holds imported packs, has been read
+        self.data = APPLICATION_DATA
+        self.stored = None
+        self.filtered_data = self.data.copy()
         self.build_ui()
         self.render_cards()
+        threading.Thread(target=self.read_store, daemon=True).start()
+        self.poll_store()
+
+    def read_store(self):
+        try:
+            migrate(self.db_path)
+            self.stored = list(fetch_applications(self.db_path))
+        except Exception as e:
+            print(f"Error loading application cards: {e}")
+            self.stored = []
+        finally:
+            close_connections()
+
+    def poll_store(self):
+        # The store is read on a background thread; poll until it's done.
+        if self.stored is None:
+            self.after(50, self.poll_store)
+            return
+        if not self.stored:
+            return
+        self.data = self.stored
+        categories = {item["category"].strip() for item in self.data}
+        self.category_filter.configure(values=["All"] + CATEGORIES + sorted(categories - set(CATEGORIES)))
+        self.apply_filter(self.category_filter.get())
 
     def build_ui(self):
         ctk.CTkLabel(self, text="💡 Applications of C Programming", font=ctk.CTkFont(size=22, weight="bold"))\
             .pack(pady=(20, 10))
 
-        self.category_filter = ctk.CTkOptionMenu(self, values=[
-            "All", "Basics", "Control Flow", "Data Structures", "Memory", "Advanced"
-        ], command=self.apply_filter)
+        self.category_filter = ctk.CTkOptionMenu(self, values=["All"] + CATEGORIES, command=self.apply_filter)
         self.category_filter.pack(pady=(0, 20))
         self.category_filter.set("All")
 
@@ -135,9 +59,9 @@ class ApplicationsPage(ctk.CTkFrame):
 
     def apply_filter(self, category):
         if category == "All":
-            self.filtered_data = APPLICATION_DATA.copy()
+            self.filtered_data = self.data.copy()
         else:
-            self.filtered_data = [item for item in APPLICATION_DATA if item["category"].strip() == category]
+            self.filtered_data = [item for item in self.data if item["category"].strip() == category]
         self.render_cards()
 
     def get_theme_colors(self):
@@ -1,20 +1,91 @@
 import sys
 import os
-from PyQt5.QtWidgets import QApplication, QMainWindow, QPlainTextEdit, QVBoxLayout, QWidget, QTextEdit, QToolBar, QAction, QFileDialog, QComboBox, QInputDialog
-from PyQt5.QtGui import QSyntaxHighlighter, QTextCharFormat, QFont, QColor, QIcon, QPixmap, QImage
-from PyQt5.QtCore import Qt, QSize
-import subprocess
+from PyQt5.QtWidgets import QApplication, QMainWindow, QPlainTextEdit, QVBoxLayout, QWidget, QTextEdit, QLabel, QToolBar, QAction, QFileDialog, QComboBox, QInputDialog, QProgressBar
+from PyQt5.QtGui import QSyntaxHighlighter, QTextCharFormat, QFont, QColor, QTextCursor
+from PyQt5.QtCore import Qt, QSize, QTimer
 import re
+import time
 import uuid
+from collections import deque
+
+# Allow running this file directly as well as through the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.artifact_store import ArtifactStore, SOURCE, EXECUTABLE, CLASSES, SAVED
+from utils.build_cache import LINK_FLAGS
+from utils.icons import tinted_icon
+from utils.large_file import LARGE_FILE_BYTES, iter_chunks
+from utils.output_buffer import OutputBuffer, format_size
+from utils.qt_job import QtJob
+from utils.runner import Limits, ProcessResult, DEFAULT_TIMEOUT
+from utils.toolchains import get_registry
+from utils.warm_pool import get_pool
+
+# How often a running program's output is drained into the pane, in milliseconds
+POLL_MS = 50
+# Wall-clock limit for one compile, in seconds
+COMPILE_TIMEOUT = 120
+# Bursts of cursor moves and edits share one status-bar update after this long, in milliseconds
+STATUS_DELAY_MS = 100
+
+# Limits enforced on programs run from the editor
+RUN_MEMORY_LIMIT = 1024 * 1024 * 1024
+RUN_OUTPUT_LIMIT = 64 * 1024 * 1024
+# Keep the JVM's reservations (heap, class space, code cache) inside RUN_MEMORY_LIMIT
+JAVA_RUN_FLAGS = ["-Xmx256m", "-XX:CompressedClassSpaceSize=64m", "-XX:ReservedCodeCacheSize=64m"]
+
+_PUBLIC_CLASS_RE = re.compile(r"\bpublic\s+(?:(?:final|abstract)\s+)*class\s+(\w+)")
+_CLASS_RE = re.compile(r"\bclass\s+(\w+)")
+
+
+def java_class_name(source):
+    """The class javac will insist the file is named after."""
+    match = _PUBLIC_CLASS_RE.search(source) or _CLASS_RE.search(source)
+    return match.group(1) if match else "Main"
+
+
+# Language-specific keywords
+LANGUAGE_KEYWORDS = {
+    "C": ['int', 'return', 'void', 'if', 'else', 'while', 'for', 'char', 'float', 'double', 'struct'],
+    "C++": ['int', 'return', 'void', 'if', 'else', 'while', 'for', 'char', 'float', 'double', 'class', 'public', 'private', 'namespace', 'using'],
+    "Python": ['def', 'return', 'if', 'else', 'elif', 'while', 'for', 'class', 'import', 'from', 'as'],
+    "Java": ['public', 'private', 'class', 'static', 'void', 'int', 'double', 'if', 'else', 'while', 'for', 'return']
+}
+
+# Block states used to carry a /* ... */ comment across lines
+NORMAL_STATE = 0
+IN_COMMENT_STATE = 1
+
+# Documents with more blocks than this are rehighlighted in time slices
+SLICE_THRESHOLD = 2000
+SLICE_SECONDS = 0.008
+
+_language_patterns = {}
+_formats = {}
+
+
+def language_pattern(language):
+    """One combined regex per language with a named group per rule, compiled once and shared."""
+    if language not in _language_patterns:
+        rules = []
+        # Comments (single-line and multi-line)
+        if language in ["C", "C++", "Java"]:
+            rules.append(r'(?P<comment>//.*)')
+            rules.append(r'(?P<block_comment>/\*.*?(?:\*/|$))')
+        elif language == "Python":
+            rules.append(r'(?P<comment>#.*)')
+        # Strings
+        rules.append(r'(?P<string>"[^"]*"|\'[^\']*\')')
+        if language in LANGUAGE_KEYWORDS:
+            words = "|".join(re.escape(word) for word in LANGUAGE_KEYWORDS[language])
+            rules.append(r'(?P<keyword>\b(?:' + words + r')\b)')
+        # Numbers
+        rules.append(r'(?P<number>\b[0-9]+\b)')
+        _language_patterns[language] = re.compile("|".join(rules))
+    return _language_patterns[language]
 
 
-class MultiLanguageHighlighter(QSyntaxHighlighter):
-    def __init__(self, parent=None, language="C"):
-        super().__init__(parent)
-        self.language = language
-        self.highlighting_rules = []
-
-        # Define formats
+def highlight_formats():
+    if not _formats:
         keyword_format = QTextCharFormat()
         keyword_format.setForeground(QColor("#569CD6"))
         keyword_format.setFontWeight(QFont.Bold)
@@ -28,39 +99,65 @@ class MultiLanguageHighlighter(QSyntaxHighlighter):
         number_format = QTextCharFormat()
         number_format.setForeground(QColor("#B5CEA8"))
 
-        # Language-specific keywords
-        language_keywords = {
-            "C": ['int', 'return', 'void', 'if', 'else', 'while', 'for', 'char', 'float', 'double', 'struct'],
-            "C++": ['int', 'return', 'void', 'if', 'else', 'while', 'for', 'char', 'float', 'double', 'class', 'public', 'private', 'namespace', 'using'],
-            "Python": ['def', 'return', 'if', 'else', 'elif', 'while', 'for', 'class', 'import', 'from', 'as'],
-            "Java": ['public', 'private', 'class', 'static', 'void', 'int', 'double', 'if', 'else', 'while', 'for', 'return']
-        }
+        _formats.update(keyword=keyword_format, comment=comment_format, block_comment=comment_format,
+                        string=string_format, number=number_format)
+    return _formats
 
-            # Language-specific patterns
-        if language in language_keywords:
-            for word in language_keywords[language]:
-                pattern = r'\b' + word + r'\b'
-                self.highlighting_rules.append((re.compile(pattern), keyword_format))
 
-        # Comments (single-line and multi-line)
-        if language in ["C", "C++", "Java"]:
-            self.highlighting_rules.append((re.compile(r'//.*'), comment_format))
-            self.highlighting_rules.append((re.compile(r'/\*[\s\S]*?\*/'), comment_format))
-        elif language == "Python":
-            self.highlighting_rules.append((re.compile(r'#.*'), comment_format))
+class MultiLanguageHighlighter(QSyntaxHighlighter):
+    def __init__(self, parent=None, language="C"):
+        super().__init__(parent)
+        self.language = language
+        self.pattern = language_pattern(language)
+        self.formats = highlight_formats()
 
-        # Strings
-        self.highlighting_rules.append((re.compile(r'"[^"]*"'), string_format))
-        self.highlighting_rules.append((re.compile(r"'[^']*'"), string_format))
+        self._next_block = 0
+        self._slice_timer = QTimer(self)
+        self._slice_timer.setInterval(0)
+        self._slice_timer.timeout.connect(self._rehighlight_slice)
 
-        # Numbers
-        self.highlighting_rules.append((re.compile(r'\b[0-9]+\b'), number_format))
+    def set_language(self, language):
+        self.language = language
+        self.pattern = language_pattern(language)
+        if self.document() is None:
+            return
+        if self.document().blockCount() <= SLICE_THRESHOLD:
+            self._slice_timer.stop()
+            self.rehighlight()
+        else:
+            self._next_block = 0
+            self._slice_timer.start()
+
+    def _rehighlight_slice(self):
+        # Rehighlight blocks until the time budget runs out, then yield to the event loop
+        document = self.document()
+        deadline = time.perf_counter() + SLICE_SECONDS
+        block = document.findBlockByNumber(self._next_block)
+        while block.isValid() and time.perf_counter() < deadline:
+            self.rehighlightBlock(block)
+            block = block.next()
+        if block.isValid():
+            self._next_block = block.blockNumber()
+        else:
+            self._slice_timer.stop()
 
     def highlightBlock(self, text):
-        for pattern, format in self.highlighting_rules:
-            for match in pattern.finditer(text):
-                start, end = match.start(), match.end()
-                self.setFormat(start, end - start, format)
+        start = 0
+        self.setCurrentBlockState(NORMAL_STATE)
+        if self.previousBlockState() == IN_COMMENT_STATE:
+            end = text.find("*/")
+            if end == -1:
+                self.setFormat(0, len(text), self.formats["comment"])
+                self.setCurrentBlockState(IN_COMMENT_STATE)
+                return
+            start = end + 2
+            self.setFormat(0, start, self.formats["comment"])
+
+        for match in self.pattern.finditer(text, start):
+            kind = match.lastgroup
+            self.setFormat(match.start(), match.end() - match.start(), self.formats[kind])
+            if kind == "block_comment" and (len(match.group()) < 4 or not match.group().endswith("*/")):
+                self.setCurrentBlockState(IN_COMMENT_STATE)
 
 class CodeEditor(QMainWindow):
     def __init__(self):
@@ -94,38 +191,36 @@ class CodeEditor(QMainWindow):
         toolbar.setIconSize(QSize(24, 24))
         self.addToolBar(Qt.TopToolBarArea, toolbar)
 
-        # Function to tint icons
-        def tint_icon(icon, color):
-            pixmap = icon.pixmap(QSize(24, 24))
-            image = pixmap.toImage()
-            for x in range(image.width()):
-                for y in range(image.height()):
-                    if image.pixelColor(x, y).alpha() > 0:  # Only tint non-transparent pixels
-                        image.setPixelColor(x, y, QColor(color))
-            return QIcon(QPixmap.fromImage(image))
-
         # Toolbar actions with elegantly colored icons and visible text
-        open_action = QAction(tint_icon(QIcon.fromTheme("document-open"), "#56B6C2"), "Open File", self)  # Cyan
+        open_action = QAction(tinted_icon("document-open", "#56B6C2"), "Open File", self)  # Cyan
         open_action.setToolTip("Open File (Ctrl+O)")
         open_action.triggered.connect(self.open_file)
         toolbar.addAction(open_action)
 
-        save_action = QAction(tint_icon(QIcon.fromTheme("document-save"), "#E5C07B"), "Save File", self)  # Gold
+        save_action = QAction(tinted_icon("document-save", "#E5C07B"), "Save File", self)  # Gold
         save_action.setToolTip("Save File (Ctrl+S)")
         save_action.triggered.connect(self.save_file)
         toolbar.addAction(save_action)
 
-        compile_action = QAction(tint_icon(QIcon.fromTheme("system-run"), "#61AFEF"), "Compile", self)  # Blue
+        compile_action = QAction(tinted_icon("system-run", "#61AFEF"), "Compile", self)  # Blue
         compile_action.setToolTip("Compile Code (F5)")
         compile_action.triggered.connect(self.compile_code)
+        self.compile_action = compile_action
         toolbar.addAction(compile_action)
 
-        run_action = QAction(tint_icon(QIcon.fromTheme("media-playback-start"), "#98C379"), "Run", self)  # Green
+        run_action = QAction(tinted_icon("media-playback-start", "#98C379"), "Run", self)  # Green
         run_action.setToolTip("Run Code (Ctrl+F5)")
         run_action.triggered.connect(self.run_code)
         self.run_action = run_action
         toolbar.addAction(run_action)
 
+        stop_action = QAction(tinted_icon("process-stop", "#E06C75"), "Stop", self)  # Red
+        stop_action.setToolTip("Stop Compile or Run (Shift+F5)")
+        stop_action.triggered.connect(self.stop_code)
+        stop_action.setEnabled(False)
+        self.stop_action = stop_action
+        toolbar.addAction(stop_action)
+
         # Language selector
         self.language_combo = QComboBox()
         self.language_combo.addItems(["C", "C++", "Python", "Java"])
@@ -170,6 +265,7 @@ class CodeEditor(QMainWindow):
         # Editor area
         self.editor = QPlainTextEdit()
         self.editor.setFont(QFont("Fira Code", 12))
+        self.editor.document().setDocumentMargin(10)
         layout.addWidget(self.editor)
 
         # Apply syntax highlighter
@@ -181,6 +277,11 @@ class CodeEditor(QMainWindow):
         self.output.setReadOnly(True)
         layout.addWidget(self.output)
 
+        # Resource usage of the last run
+        self.stats_label = QLabel("")
+        self.stats_label.setStyleSheet("color: #808080; font-family: 'Fira Code'; font-size: 11px;")
+        layout.addWidget(self.stats_label)
+
         # Status bar with line counter
         self.statusBar().setStyleSheet("""
             QStatusBar {
@@ -193,14 +294,58 @@ class CodeEditor(QMainWindow):
         """)
         self.statusBar().showMessage("Ready | Line: 1 | Total Lines: 0")
 
+        # Progress of a large file being loaded in the background
+        self.load_progress = QProgressBar()
+        self.load_progress.setMaximumWidth(200)
+        self.load_progress.setTextVisible(False)
+        self.load_progress.hide()
+        self.statusBar().addPermanentWidget(self.load_progress)
+
         # Initialize variables
         self.executable = None
+        # (pool, source, name) when the last Python compile went through the warm worker
+        self.pooled = None
         self.current_file = None
+
+        # Probe the toolchains once in the background, then grey out languages that can't run
+        self.toolchains = get_registry().start()
+        self.toolchain_job = QtJob(lambda job: self.toolchains.wait())
+        self.toolchain_job.signals.finished.connect(self.update_languages)
+        self.toolchain_job.start()
+
+        # Start the Python worker now so the first run doesn't wait for it
+        get_pool("Python").warm()
+
+        # Index of everything written under Output/; clear out builds left by crashed sessions
+        self.artifacts = ArtifactStore(self.output_dir, session=self.temp_file_name)
+        self.cleanup_job = QtJob(lambda job: self.artifacts.clean_orphans())
+        self.cleanup_job.signals.finished.connect(self.report_cleanup)
+        self.cleanup_job.start()
+        self.build_job = None
+        self.run_job = None
+        self.output_buffer = None
+        self.last_result = None
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(POLL_MS)
+        self.render_timer.timeout.connect(self.render_output)
         self.run_action.setEnabled(False)
 
-        # Connect editor signals for line counter
-        self.editor.cursorPositionChanged.connect(self.update_line_counter)
-        self.editor.textChanged.connect(self.update_line_counter)
+        # Large files are loaded in chunks with highlighting off
+        self.large_file_mode = False
+        self.load_job = None
+        self.pending_chunks = deque()
+        self.insert_timer = QTimer(self)
+        self.insert_timer.setInterval(0)
+        self.insert_timer.timeout.connect(self.insert_next_chunk)
+
+        # Connect editor signals for line counter, coalesced through a single-shot timer
+        self.status_timer = QTimer(self)
+        self.status_timer.setSingleShot(True)
+        self.status_timer.setInterval(STATUS_DELAY_MS)
+        self.status_timer.timeout.connect(self.update_line_counter)
+        self.editor.cursorPositionChanged.connect(self.status_timer.start)
+        self.editor.textChanged.connect(self.status_timer.start)
         self.update_line_counter()
 
         #Ddark theme
@@ -230,6 +375,9 @@ class CodeEditor(QMainWindow):
         """)
 
     def update_line_counter(self):
+        if self.load_job is not None or self.pending_chunks:
+            # The loading message and progress bar own the status bar until the file is in
+            return
         cursor = self.editor.textCursor()
         current_line = cursor.blockNumber() + 1
         total_lines = self.editor.document().blockCount()
@@ -237,8 +385,10 @@ class CodeEditor(QMainWindow):
 
     def change_language(self, language):
         self.current_language = language
-        self.highlighter = MultiLanguageHighlighter(self.editor.document(), self.current_language)
-        self.editor.document().setDocumentMargin(10)
+        self.highlighter.set_language(self.current_language)
+        # Changing the margin relayouts (and rehighlights) the whole document, so only do it once
+        if self.editor.document().documentMargin() != 10:
+            self.editor.document().setDocumentMargin(10)
         lang_path = os.path.join(self.output_dir, self.current_language)
         try:
             os.makedirs(lang_path, exist_ok=True)
@@ -248,6 +398,7 @@ class CodeEditor(QMainWindow):
         except Exception as e:
             print(f"Error creating folder for {self.current_language}: {e}")
         self.update_line_counter()
+        self.status_timer.stop()
         self.statusBar().showMessage(f"Language changed to {language} | Line: {self.editor.textCursor().blockNumber() + 1} | Total Lines: {self.editor.document().blockCount()}")
 
     def open_file(self):
@@ -259,14 +410,100 @@ class CodeEditor(QMainWindow):
         }
         file_name, _ = QFileDialog.getOpenFileName(self, "Open File", "", file_extensions[self.current_language])
         if file_name:
-            try:
-                with open(file_name, "r") as f:
-                    self.editor.setPlainText(f.read())
-                self.current_file = file_name
-                self.update_line_counter()
-                self.statusBar().showMessage(f"Opened {file_name} | Line: {self.editor.textCursor().blockNumber() + 1} | Total Lines: {self.editor.document().blockCount()}")
-            except Exception as e:
-                self.output.setText(f"Failed to open file: {str(e)}")
+            self.load_file(file_name)
+
+    def load_file(self, file_name):
+        # A finished load may still be inserting its last chunks; they'd land in the new document
+        if self.load_job is not None or self.pending_chunks or self.insert_timer.isActive():
+            self.show_status("Still opening the previous file")
+            return
+        try:
+            if os.path.getsize(file_name) > LARGE_FILE_BYTES:
+                self.load_large_file(file_name)
+                return
+            with open(file_name, "r") as f:
+                self.editor.setPlainText(f.read())
+            self.set_large_file_mode(False)
+            self.current_file = file_name
+            self.update_line_counter()
+            self.status_timer.stop()
+            self.statusBar().showMessage(f"Opened {file_name} | Line: {self.editor.textCursor().blockNumber() + 1} | Total Lines: {self.editor.document().blockCount()}")
+        except Exception as e:
+            self.output.setText(f"Failed to open file: {str(e)}")
+
+    def set_large_file_mode(self, enabled):
+        if enabled == self.large_file_mode:
+            return
+        self.large_file_mode = enabled
+        # Detaching the highlighter skips highlightBlock entirely; reattaching rehighlights once
+        self.highlighter.setDocument(None if enabled else self.editor.document())
+        self.editor.setLineWrapMode(QPlainTextEdit.NoWrap if enabled else QPlainTextEdit.WidgetWidth)
+
+    def load_large_file(self, file_name):
+        size = os.path.getsize(file_name)
+        self.set_large_file_mode(True)
+        self.editor.clear()
+        self.editor.setReadOnly(True)
+        self.editor.setUndoRedoEnabled(False)
+        self.load_progress.setRange(0, size)
+        self.load_progress.setValue(0)
+        self.load_progress.show()
+
+        def load(job):
+            # Runs on the thread pool; the GUI thread inserts the chunks
+            for chunk in iter_chunks(file_name):
+                if job.cancelled:
+                    return None
+                job.emit("chunk", chunk)
+            return file_name
+
+        self.load_job = QtJob(load)
+        self.load_job.signals.event.connect(self.queue_chunk)
+        self.load_job.signals.finished.connect(self.finish_load)
+        self.load_job.signals.error.connect(self.load_failed)
+        self.load_job.start()
+        self.show_status(f"Loading {file_name} ({size / (1024 * 1024):.1f} MB, large file mode: highlighting off)")
+
+    def queue_chunk(self, kind, chunk):
+        self.pending_chunks.append(chunk)
+        if not self.insert_timer.isActive():
+            self.insert_timer.start()
+
+    def insert_next_chunk(self):
+        # One chunk per event-loop pass keeps the window painting while a big file streams in
+        if not self.pending_chunks:
+            self.insert_timer.stop()
+            if self.load_job is None:
+                self.finish_insert()
+            return
+        text, done = self.pending_chunks.popleft()
+        cursor = QTextCursor(self.editor.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        self.load_progress.setValue(done)
+
+    def finish_load(self, file_name):
+        self.load_job = None
+        self.current_file = file_name
+        if not self.insert_timer.isActive():
+            self.finish_insert()
+
+    def finish_insert(self):
+        self.editor.setReadOnly(False)
+        self.editor.setUndoRedoEnabled(True)
+        self.editor.moveCursor(QTextCursor.Start)
+        self.load_progress.hide()
+        self.status_timer.stop()
+        self.show_status(f"Opened {self.current_file} (large file mode: highlighting off)")
+
+    def load_failed(self, error):
+        self.load_job = None
+        self.insert_timer.stop()
+        self.pending_chunks.clear()
+        self.editor.setReadOnly(False)
+        self.editor.setUndoRedoEnabled(True)
+        self.load_progress.hide()
+        self.output.setText(f"Failed to open file: {str(error)}")
 
     def save_file(self):
         if not self.current_file:
@@ -284,6 +521,8 @@ class CodeEditor(QMainWindow):
                     os.makedirs(os.path.dirname(save_path), exist_ok=True)
                     with open(save_path, "w") as f:
                         f.write(self.editor.toPlainText())
+                    # Never let artifact cleanup touch what the user saved
+                    self.artifacts.register(save_path, SAVED)
                     self.current_file = save_path
                     self.update_line_counter()
                     self.statusBar().showMessage(f"Saved {save_path} | Line: {self.editor.textCursor().blockNumber() + 1} | Total Lines: {self.editor.document().blockCount()}")
@@ -293,12 +532,15 @@ class CodeEditor(QMainWindow):
             try:
                 with open(self.current_file, "w") as f:
                     f.write(self.editor.toPlainText())
+                self.artifacts.register(self.current_file, SAVED)
                 self.update_line_counter()
                 self.statusBar().showMessage(f"Saved {self.current_file} | Line: {self.editor.textCursor().blockNumber() + 1} | Total Lines: {self.editor.document().blockCount()}")
             except Exception as e:
                 self.output.setText(f"Failed to save file: {str(e)}")
 
     def compile_code(self):
+        if self.build_job is not None:
+            return
         code = self.editor.toPlainText()
         if not code.strip():
             self.output.setText("Error: No code to compile.")
@@ -321,58 +563,201 @@ class CodeEditor(QMainWindow):
         with open(temp_file, "w") as f:
             f.write(code)
 
-        try:
-            if self.current_language == "C":
-                compiler_cmd = ["gcc", "-o", os.path.join(lang_path, self.temp_file_name), temp_file]
-                result = subprocess.run(compiler_cmd, capture_output=True, text=True)
-                self.executable = os.path.join(lang_path, self.temp_file_name) if sys.platform != "win32" else os.path.join(lang_path, f"{self.temp_file_name}.exe")
-            elif self.current_language == "C++":
-                compiler_cmd = ["g++", "-o", os.path.join(lang_path, self.temp_file_name), temp_file]
-                result = subprocess.run(compiler_cmd, capture_output=True, text=True)
-                self.executable = os.path.join(lang_path, self.temp_file_name) if sys.platform != "win32" else os.path.join(lang_path, f"{self.temp_file_name}.exe")
-            elif self.current_language == "Python":
-                self.executable = ["python", temp_file]
-                result = subprocess.run(["python", "--version"], capture_output=True, text=True)
-                if result.returncode != 0:
-                    raise FileNotFoundError("Python not found")
-            elif self.current_language == "Java":
-                compiler_cmd = ["javac", temp_file]
-                result = subprocess.run(compiler_cmd, capture_output=True, text=True)
-                self.executable = ["java", "-cp", lang_path, os.path.splitext(os.path.basename(temp_file))[0]]
-
-            if self.current_language != "Python" and result.returncode == 0:
-                self.output.setHtml('<span style="color: #98C379;">Compilation successful!</span>')
-                self.run_action.setEnabled(True)
-                self.statusBar().showMessage(f"Compilation successful | Line: {self.editor.textCursor().blockNumber() + 1} | Total Lines: {self.editor.document().blockCount()}")
-            elif self.current_language == "Python":
-                self.output.setHtml('<span style="color: #98C379;">Python ready to run!</span>')
-                self.run_action.setEnabled(True)
-                self.statusBar().showMessage(f"Python ready | Line: {self.editor.textCursor().blockNumber() + 1} | Total Lines: {self.editor.document().blockCount()}")
-            else:
-                self.output.setHtml(f'<span style="color: #D16969;">Compilation failed:</span><br>{result.stderr}')
-                self.run_action.setEnabled(False)
-                self.statusBar().showMessage(f"Compilation failed | Line: {self.editor.textCursor().blockNumber() + 1} | Total Lines: {self.editor.document().blockCount()}")
-        except FileNotFoundError as e:
-            self.output.setHtml(f'<span style="color: #D16969;">Compilation failed: {str(e)}. Please install the required compiler.</span>')
-            self.run_action.setEnabled(False)
-            self.statusBar().showMessage(f"Compiler not found | Line: {self.editor.textCursor().blockNumber() + 1} | Total Lines: {self.editor.document().blockCount()}")
-        except Exception as e:
-            self.output.setHtml(f'<span style="color: #D16969;">Compilation failed: {str(e)}</span>')
-            self.run_action.setEnabled(False)
-            self.statusBar().showMessage(f"Compilation error | Line: {self.editor.textCursor().blockNumber() + 1} | Total Lines: {self.editor.document().blockCount()}")
+        language = self.current_language
+        if self.toolchains.ready and self.toolchains.missing(language):
+            missing = ", ".join(self.toolchains.missing(language))
+            self.output.setHtml(f'<span style="color: #D16969;">Compilation failed: {missing} not found. Please install the required compiler.</span>')
+            self.show_status("Compiler not found")
+            return
+        toolchains = self.toolchains
+        executable = os.path.join(lang_path, self.temp_file_name) if sys.platform != "win32" else os.path.join(lang_path, f"{self.temp_file_name}.exe")
+
+        java_dir = os.path.join(lang_path, self.temp_file_name)
+        artifacts = self.artifacts
+
+        def build(job):
+            # Runs on the thread pool; returns (language, result, executable, pooled)
+            job.status(f"Compiling {language}...")
+            artifacts.register(temp_file, SOURCE)
+            missing = toolchains.missing(language)
+            if missing:
+                raise FileNotFoundError(f"{', '.join(missing)} not found")
+            if language in ("C", "C++"):
+                compiler = toolchains.path("gcc" if language == "C" else "g++")
+                result = job.run_process([compiler, "-o", executable, temp_file, *LINK_FLAGS])
+                artifacts.register(executable, EXECUTABLE)
+                return language, result, executable, None
+            if language == "Python":
+                pool = get_pool(language)
+                if pool.available():
+                    # Syntax-check on the warm worker instead of probing for an interpreter
+                    return language, pool.compile(code, job=job), None, (pool, code, "-")
+                # Nothing to build; the registry already knows the interpreter is there
+                return language, ProcessResult(0, "", ""), [toolchains.path("python"), temp_file], None
+            # javac wants the file named after its public class, so each session builds in a folder of its own
+            class_name = java_class_name(code)
+            os.makedirs(java_dir, exist_ok=True)
+            java_file = os.path.join(java_dir, f"{class_name}.java")
+            with open(java_file, "w") as f:
+                f.write(code)
+            artifacts.register(java_file, SOURCE)
+            started = time.time()
+            result = job.run_process([toolchains.path("javac"), "-d", java_dir, java_file])
+            for entry in os.scandir(java_dir):
+                if entry.name.endswith(".class") and entry.stat().st_mtime >= started - 1:
+                    artifacts.register(entry.path, CLASSES)
+            return language, result, [toolchains.path("java"), *JAVA_RUN_FLAGS, "-cp", java_dir, class_name], None
+
+        self.executable = None
+        self.pooled = None
+        self.run_action.setEnabled(False)
+        self.compile_action.setEnabled(False)
+        self.stop_action.setEnabled(True)
+        self.output.setHtml('<span style="color: #808080;">Compiling...</span>')
+        self.build_job = QtJob(build, timeout=COMPILE_TIMEOUT)
+        self.build_job.signals.progress.connect(self.show_status)
+        self.build_job.signals.finished.connect(self.finish_compile)
+        self.build_job.signals.cancelled.connect(self.finish_compile)
+        self.build_job.signals.error.connect(self.compile_failed)
+        self.build_job.start()
+
+    def update_languages(self, registry):
+        self.toolchain_job = None
+        model = self.language_combo.model()
+        for row in range(self.language_combo.count()):
+            missing = registry.missing(self.language_combo.itemText(row))
+            item = model.item(row)
+            item.setEnabled(not missing)
+            item.setToolTip(f"Not installed: {', '.join(missing)}" if missing else "")
+        if registry.missing(self.current_language):
+            self.show_status(f"{self.current_language} is unavailable: {', '.join(registry.missing(self.current_language))} not found")
+
+    def report_cleanup(self, value):
+        removed, reclaimed = value
+        self.cleanup_job = None
+        if removed:
+            self.show_status(f"Reclaimed {format_size(reclaimed)} from {removed} old build file{'s' if removed != 1 else ''}")
+
+    def show_status(self, text):
+        self.statusBar().showMessage(f"{text} | Line: {self.editor.textCursor().blockNumber() + 1} | Total Lines: {self.editor.document().blockCount()}")
+
+    def finish_compile(self, value):
+        language, result, executable, pooled = value
+        self.build_job = None
+        self.compile_action.setEnabled(True)
+        self.stop_action.setEnabled(self.run_job is not None)
+        if result.cancelled:
+            self.output.setHtml('<span style="color: #D16969;">Compilation stopped.</span>')
+            self.show_status("Compilation stopped")
+        elif result.ok and language != "Python":
+            self.executable, self.pooled = executable, pooled
+            self.output.setHtml('<span style="color: #98C379;">Compilation successful!</span>')
+            self.run_action.setEnabled(True)
+            self.show_status("Compilation successful")
+        elif result.ok:
+            self.executable, self.pooled = executable, pooled
+            self.output.setHtml('<span style="color: #98C379;">Python ready to run!</span>')
+            self.run_action.setEnabled(True)
+            self.show_status("Python ready")
+        else:
+            message = result.stderr if not result.timed_out else f"No result after {COMPILE_TIMEOUT}s"
+            self.output.setHtml(f'<span style="color: #D16969;">Compilation failed:</span><br>{message}')
+            self.show_status("Compilation failed")
+
+    def compile_failed(self, error):
+        self.build_job = None
+        self.compile_action.setEnabled(True)
+        self.stop_action.setEnabled(self.run_job is not None)
+        if isinstance(error, FileNotFoundError):
+            self.output.setHtml(f'<span style="color: #D16969;">Compilation failed: {str(error)}. Please install the required compiler.</span>')
+            self.show_status("Compiler not found")
+        else:
+            self.output.setHtml(f'<span style="color: #D16969;">Compilation failed: {str(error)}</span>')
+            self.show_status("Compilation error")
 
     def run_code(self):
-        if self.executable:
-            try:
-                result = subprocess.run(self.executable, capture_output=True, text=True, cwd=os.path.join(self.output_dir, self.current_language))
-                output_text = (result.stdout or "") + (result.stderr or "")
-                if not output_text:
-                    output_text = "No output"
-                self.output.setHtml(f'<pre style="color: #D4D4D4;">{output_text}</pre>')
-                self.statusBar().showMessage(f"Program executed | Line: {self.editor.textCursor().blockNumber() + 1} | Total Lines: {self.editor.document().blockCount()}")
-            except Exception as e:
-                self.output.setHtml(f'<pre style="color: #D16969;">Execution failed: {str(e)}</pre>')
-                self.statusBar().showMessage(f"Execution error | Line: {self.editor.textCursor().blockNumber() + 1} | Total Lines: {self.editor.document().blockCount()}")
+        if (self.executable or self.pooled) and self.run_job is None:
+            self.output.clear()
+            self.output_buffer = OutputBuffer()
+            cwd = os.path.join(self.output_dir, self.current_language)
+            executable = self.executable
+            pooled = self.pooled
+            limits = Limits(cpu_seconds=DEFAULT_TIMEOUT, memory_bytes=RUN_MEMORY_LIMIT, output_bytes=RUN_OUTPUT_LIMIT)
+            artifacts = self.artifacts
+
+            def run(job):
+                job.status("Running...")
+                if isinstance(executable, str):
+                    artifacts.touch(executable)
+                if pooled:
+                    pool, source, name = pooled
+                    return pool.run(job, source, name, cwd, limits=limits, output=job.stdout, error_output=job.stderr)
+                return job.run_process(executable, cwd=cwd, output=job.stdout, error_output=job.stderr, limits=limits)
+
+            self.stats_label.setText("")
+            self.run_action.setEnabled(False)
+            self.stop_action.setEnabled(True)
+            self.run_job = QtJob(run)
+            self.run_job.signals.progress.connect(self.show_status)
+            self.run_job.signals.output.connect(self.append_output)
+            self.run_job.signals.error_output.connect(self.append_output)
+            self.run_job.signals.finished.connect(self.finish_run)
+            self.run_job.signals.cancelled.connect(self.finish_run)
+            self.run_job.signals.error.connect(self.run_failed)
+            self.run_job.start()
+
+    def append_output(self, text):
+        self.output_buffer.write(text)
+        # Coalesce bursts of output into one redraw per POLL_MS
+        if not self.render_timer.isActive():
+            self.render_timer.start()
+
+    def render_output(self):
+        redraw, text = self.output_buffer.take()
+        if redraw:
+            self.output.setPlainText(text)
+        elif text:
+            self.output.moveCursor(QTextCursor.End)
+            self.output.insertPlainText(text)
+        else:
+            return
+        self.output.moveCursor(QTextCursor.End)
+
+    def finish_run(self, result):
+        self.run_job = None
+        self.render_timer.stop()
+        self.run_action.setEnabled(True)
+        self.stop_action.setEnabled(self.build_job is not None)
+        self.render_output()
+        if not self.output_buffer.total_chars:
+            self.output.setPlainText("No output")
+        if not result.ok:
+            self.output.append(f"[{result.exit_status().capitalize()}]")
+        self.last_result = result
+        self.stats_label.setText(result.summary())
+        self.show_status("Program stopped" if result.cancelled else "Program executed")
+
+    def run_failed(self, error):
+        self.run_job = None
+        self.render_timer.stop()
+        self.run_action.setEnabled(True)
+        self.stop_action.setEnabled(self.build_job is not None)
+        self.output.setHtml(f'<pre style="color: #D16969;">Execution failed: {str(error)}</pre>')
+        self.show_status("Execution error")
+
+    def stop_code(self):
+        for job in (self.build_job, self.run_job):
+            if job is not None:
+                job.cancel()
+        self.show_status("Stopping...")
+
+    def closeEvent(self, event):
+        # Don't let the thread pool hold the app open until a program finishes
+        self.stop_code()
+        if self.load_job is not None:
+            self.load_job.cancel()
+        self.artifacts.close_session()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
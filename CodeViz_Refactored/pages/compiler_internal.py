@@ -1,9 +1,27 @@
 import customtkinter as ctk
-from tkinter import Text, filedialog
-import subprocess
-from pygments import lex
-from pygments.lexers import CLexer
- 
+from tkinter import Text, TclError, filedialog
+from pages.test_panel import TestPanel
+from utils.benchmark import run_benchmark, format_table, OPT_LEVELS
+from utils.build_cache import get_build_cache, compile_source
+from utils.diagnostics import SyntaxChecker
+from utils.highlighter import IncrementalHighlighter
+from utils.output_buffer import OutputBuffer
+from utils.runner import Job, Limits, DEFAULT_TIMEOUT
+from utils.toolchains import get_registry
+from utils.workspace import Workspace
+
+# How often the UI checks a running job for progress, in milliseconds
+POLL_MS = 50
+
+COMPILE_FLAGS = []
+
+# Timed runs per optimisation level in benchmark mode (after warm-up)
+BENCHMARK_RUNS = 10
+
+# Limits enforced on student programs (the CPU limit follows the timeout)
+RUN_MEMORY_LIMIT = 1024 * 1024 * 1024
+RUN_OUTPUT_LIMIT = 64 * 1024 * 1024
+
 TOOLTIP_KEYWORDS = {
     "int": "Defines an integer variable or function return type.",
     "float": "Defines a floating-point variable or function return type.",
@@ -41,7 +59,7 @@ TOOLTIP_KEYWORDS = {
 }
 
 
-def get_compiler_frame(parent):
+def get_compiler_frame(parent, timeout=DEFAULT_TIMEOUT):
     frame = ctk.CTkFrame(parent, corner_radius=10)
     frame.pack_propagate(False)
 
@@ -55,33 +73,136 @@ def get_compiler_frame(parent):
 
     output = ctk.CTkTextbox(frame, height=120, fg_color="#0f0f0f", text_color="lightgreen",
                             font=("Consolas", 13))
-    output.pack(fill="x", padx=20, pady=(0, 10))
+    output.pack(fill="x", padx=20, pady=(0, 0))
+
+    stats_label = ctk.CTkLabel(frame, text="", text_color="gray", font=("Consolas", 12), anchor="w")
+    stats_label.pack(fill="x", padx=24, pady=(0, 10))
     output.configure(state="disabled")
 
     button_row = ctk.CTkFrame(frame, fg_color="transparent")
     button_row.pack(pady=5)
 
+    def set_output(text):
+        output.configure(state="normal")
+        output.delete("1.0", "end")
+        output.insert("1.0", text)
+        output.configure(state="disabled")
+
+    def append_output(text):
+        output.configure(state="normal")
+        output.insert("end", text)
+        output.see("end")
+        output.configure(state="disabled")
+
+    def render_output():
+        # Called at most once per poll, so a chatty program costs one redraw per tick
+        redraw, text = current["output"].take()
+        if redraw:
+            set_output(text)
+            output.see("end")
+        elif text:
+            append_output(text)
+
+    current = {"job": None, "output": None}
+    build_cache = get_build_cache()
+
     def run_code():
+        if current["job"] is not None:
+            return
+        code = editor.get("1.0", "end-1c")
+
+        def compile_and_run(job):
+            job.status("Compiling...")
+            executable, failed = compile_source(job, code, COMPILE_FLAGS, cache=build_cache)
+            if failed is not None:
+                return "compile", failed
+            job.status("Running...")
+            limits = Limits(cpu_seconds=timeout, memory_bytes=RUN_MEMORY_LIMIT, output_bytes=RUN_OUTPUT_LIMIT)
+            with Workspace() as workspace:
+                return "run", job.run_process([executable], cwd=workspace.path, output=current["output"],
+                                              limits=limits)
+
+        start_job(compile_and_run)
+
+    def benchmark_code():
+        if current["job"] is not None:
+            return
         code = editor.get("1.0", "end-1c")
-        with open("temp.c", "w", encoding="utf-8") as f:
-            f.write(code)
 
-        try:
-            compile_result = subprocess.run(["gcc", "temp.c", "-o", "temp.exe"], capture_output=True, text=True)
-            output.configure(state="normal")
-            output.delete("1.0", "end")
+        def benchmark(job):
+            return "benchmark", run_benchmark(job, code, runs=BENCHMARK_RUNS)
+
+        start_job(benchmark)
+
+    def start_job(target):
+        set_output("")
+        stats_label.configure(text="")
+        current["output"] = OutputBuffer()
+        current["job"] = Job(target, timeout=timeout).start()
+        run_button.configure(state="disabled")
+        benchmark_button.configure(state="disabled")
+        stop_button.configure(state="normal")
+        poll_job()
 
-            if compile_result.returncode != 0:
-                output.insert("1.0", compile_result.stderr)
+    def poll_job():
+        job = current["job"]
+        for kind, payload in job.poll():
+            if kind == "status":
+                status_label.configure(text=payload)
             else:
-                run_result = subprocess.run(["temp.exe"], capture_output=True, text=True)
-                output.insert("1.0", run_result.stdout)
+                finish_job(kind, payload)
+                return
+        render_output()
+        frame.after(POLL_MS, poll_job)
 
-        except Exception as e:
-            output.configure(state="normal")
-            output.insert("1.0", str(e))
+    def finish_job(kind, payload):
+        current["job"] = None
+        run_button.configure(state="normal")
+        benchmark_button.configure(state="normal")
+        stop_button.configure(state="disabled")
 
-        output.configure(state="disabled")
+        if kind == "error":
+            set_output(str(payload))
+            status_label.configure(text="Error")
+            return
+
+        step, result = payload
+        if step == "benchmark":
+            set_output(format_table(result, runs=BENCHMARK_RUNS))
+            status_label.configure(text="Stopped" if len(result) < len(OPT_LEVELS) else "Benchmark finished")
+            cache_label.configure(text=build_cache.stats())
+            return
+        if step == "compile":
+            set_output(result.stderr)
+        else:
+            render_output()
+        text = ""
+        if result.timed_out:
+            text = f"\n[Timed out after {timeout}s]"
+            status_label.configure(text="Timed out")
+        elif result.cancelled:
+            text = "\n[Stopped]"
+            status_label.configure(text="Stopped")
+        elif step == "compile":
+            status_label.configure(text="Compilation failed")
+        else:
+            status_label.configure(text=f"Finished ({result.exit_status()})")
+        if text:
+            append_output(text)
+        if step == "run":
+            stats_label.configure(text=result.summary())
+        cache_label.configure(text=build_cache.stats())
+
+    def open_tests():
+        panel = current.get("tests")
+        if panel is not None and panel.winfo_exists():
+            panel.focus()
+            return
+        current["tests"] = TestPanel(frame, lambda: editor.get("1.0", "end-1c"), timeout)
+
+    def stop_code():
+        if current["job"] is not None:
+            current["job"].cancel()
 
     def clear_all():
         editor.delete("1.0", "end")
@@ -103,68 +224,126 @@ def get_compiler_frame(parent):
                 code = f.read()
             editor.delete("1.0", "end")
             editor.insert("1.0", code)
-            highlight_code()
+            highlighter.flush()
 
      
 
-    ctk.CTkButton(button_row, text="Run", command=run_code).pack(side="left", padx=10)
+    run_button = ctk.CTkButton(button_row, text="Run", command=run_code)
+    run_button.pack(side="left", padx=10)
+    benchmark_button = ctk.CTkButton(button_row, text="Benchmark", command=benchmark_code)
+    benchmark_button.pack(side="left", padx=10)
+    stop_button = ctk.CTkButton(button_row, text="Stop", command=stop_code, state="disabled")
+    stop_button.pack(side="left", padx=10)
+    tests_button = ctk.CTkButton(button_row, text="Tests", command=open_tests)
+    tests_button.pack(side="left", padx=10)
     ctk.CTkButton(button_row, text="Clear", command=clear_all).pack(side="left", padx=10)
     ctk.CTkButton(button_row, text="Save", command=save_to_file).pack(side="left", padx=10)
     ctk.CTkButton(button_row, text="Open", command=open_from_file).pack(side="left", padx=10)
 
-    def highlight_code(event=None):
-        code = editor.get("1.0", "end-1c")
-        for tag in editor.tag_names():
-            if tag != "sel":
-                editor.tag_delete(tag)
-
-        start_index = 0
-        for token_type, token_str in lex(code, CLexer()):
-            if token_str == "\n":
-                start_index += 1
-                continue
+    status_label = ctk.CTkLabel(button_row, text="Ready", width=160, anchor="w")
+    status_label.pack(side="left", padx=10)
+    cache_label = ctk.CTkLabel(button_row, text=build_cache.stats(), text_color="gray")
+    cache_label.pack(side="left", padx=10)
 
-            start = f"1.0+{start_index}c"
-            end = f"1.0+{start_index + len(token_str)}c"
-            tag_name = str(token_type)
-            editor.tag_add(tag_name, start, end)
-
-            if tag_name == "Token.Keyword":
-                editor.tag_config(tag_name, foreground="#82AAFF")
-            elif tag_name == "Token.Literal.String":
-                editor.tag_config(tag_name, foreground="#C3E88D")
-            elif tag_name == "Token.Comment":
-                editor.tag_config(tag_name, foreground="#546E7A")
-            elif tag_name == "Token.Name.Function":
-                editor.tag_config(tag_name, foreground="#F78C6C")
-            elif tag_name == "Token.Operator":
-                editor.tag_config(tag_name, foreground="#89DDFF")
-            elif tag_name == "Token.Literal.Number":
-                editor.tag_config(tag_name, foreground="#F78C6C")
-            else:
-                editor.tag_config(tag_name, foreground="#ECEFF1")
+    # Toolchains are probed once in the background; grey out what can't work
+    registry = get_registry().start()
+
+    def check_toolchain():
+        if not registry.ready:
+            frame.after(POLL_MS, check_toolchain)
+            return
+        if registry.missing("C"):
+            for button in (run_button, benchmark_button, tests_button):
+                button.configure(state="disabled")
+            status_label.configure(text="gcc not found: install GCC to run C programs")
+
+    check_toolchain()
+
+    # Re-lexes only the edited lines, debounced across keystrokes
+    highlighter = IncrementalHighlighter(editor)
+    hovered = {"start": None}
+    diagnostics = []
+
+    def diagnostic_at(index):
+        line, col = (int(part) for part in index.split("."))
+        for diagnostic, start, end in diagnostics:
+            if diagnostic.line == line and start <= col < end:
+                return diagnostic, f"{line}.{start}"
+        return None
 
-            if token_str in TOOLTIP_KEYWORDS:
-                tooltip_tag = f"tooltip_{token_str}_{start_index}"
-                editor.tag_add(tooltip_tag, start, end)
+    def on_motion(e):
+        index = editor.index(f"@{e.x},{e.y}")
+        bbox = editor.bbox(index)
+        if not bbox or not bbox[0] <= e.x < bbox[0] + bbox[2]:
+            on_leave(e)
+            return
+        found = diagnostic_at(index)
+        if found is not None:
+            diagnostic, start = found
+            text = f"{diagnostic.severity}: {diagnostic.message}"
+        else:
+            token = highlighter.token_at(index)
+            if token is None or token[0] not in TOOLTIP_KEYWORDS:
+                on_leave(e)
+                return
+            word, _, start, _ = token
+            text = TOOLTIP_KEYWORDS[word]
+        if hovered["start"] == start:
+            return
+        hovered["start"] = start
+        tooltip_label.configure(text=text)
+        bbox = editor.bbox(start)
+        if bbox:
+            x, y, width, height = bbox
+            tooltip_label.place(x=x + width + 15, y=y-10)
 
-                def on_enter(e, word=token_str, pos=start):
-                    tooltip_label.configure(text=TOOLTIP_KEYWORDS[word])
-                    bbox = editor.bbox(pos)
-                    if bbox:
-                        x, y, width, height = bbox
-                        tooltip_label.place(x=x + width + 15, y=y-10)
+    def on_leave(e):
+        if hovered["start"] is not None:
+            hovered["start"] = None
+            tooltip_label.place_forget()
+
+    # One hover handler for the whole editor, backed by the highlighter's span index
+    editor.bind("<Motion>", on_motion)
+    editor.bind("<Leave>", on_leave)
+
+    def show_diagnostics(results):
+        editor.tag_remove("diag_error", "1.0", "end")
+        editor.tag_remove("diag_warning", "1.0", "end")
+        diagnostics.clear()
+        for diagnostic in results:
+            if diagnostic.severity not in ("error", "warning"):
+                continue
+            start = f"{diagnostic.line}.{diagnostic.column}"
+            if diagnostic.end_column is not None and diagnostic.end_column > diagnostic.column:
+                end = f"{diagnostic.line}.{diagnostic.end_column}"
+            else:
+                end = editor.index(f"{start} wordend")
+                if editor.compare(end, "==", start) or int(end.split(".")[0]) != diagnostic.line:
+                    end = f"{start}+1c"
+            end_col = int(editor.index(end).split(".")[1])
+            editor.tag_add(f"diag_{diagnostic.severity}", start, end)
+            diagnostics.append((diagnostic, diagnostic.column, max(end_col, diagnostic.column + 1)))
 
-                def on_leave(e):
-                    tooltip_label.place_forget()
+    editor.tag_configure("diag_error", underline=True)
+    editor.tag_configure("diag_warning", underline=True)
+    try:
+        editor.tag_configure("diag_error", underlinefg="#E06C75")
+        editor.tag_configure("diag_warning", underlinefg="#E5C07B")
+    except TclError:
+        # Coloured underlines need Tk 8.6.11 or newer.
+        pass
 
-                editor.tag_bind(tooltip_tag, "<Enter>", on_enter)
-                editor.tag_bind(tooltip_tag, "<Leave>", on_leave)
+    # Background gcc -fsyntax-only after a typing pause; stale checks are cancelled
+    checker = SyntaxChecker(editor, lambda: editor.get("1.0", "end-1c"), show_diagnostics)
 
-            start_index += len(token_str)
+    def on_modified(e):
+        if editor.edit_modified():
+            editor.edit_modified(False)
+            checker.schedule()
 
-    editor.bind("<KeyRelease>", highlight_code)
+    editor.bind("<<Modified>>", on_modified)
+    editor.bind("<Destroy>", lambda e: checker.cancel() if e.widget is editor else None, add="+")
 
     editor.insert("1.0", """#include <stdio.h>\n\nint main() {\n    printf(\"Hello, World!\\n\");\n    return 0;\n}\n""")
-    highlight_code()
+    highlighter.flush()
     return frame
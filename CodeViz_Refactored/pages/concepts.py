@@ -1,11 +1,24 @@
 import customtkinter as ctk
 from tkinter import Text, Scrollbar, RIGHT, Y
-import re
-import os
+import bisect
+import json
+import threading
+from utils.content_bundle import open_bundle
+from utils.db_utils import DB_PATH, close_connections, fetch_concepts, migrate
+from utils.search_index import content_digest, get_index
+from utils.virtual_list import VirtualList
+
+# Wait this long after the last keystroke before searching
+SEARCH_DELAY_MS = 150
+# Topics rendered beyond each edge of the visible area, so scrolling rarely shows a placeholder
+RENDER_AHEAD = 2
+# Width of one topic bar button plus its gap
+TOPIC_BUTTON_SIZE = 172
 
 class ConceptsPage(ctk.CTkFrame):
-    def __init__(self, parent):
+    def __init__(self, parent, db_path=DB_PATH):
         super().__init__(parent)
+        self.db_path = db_path
 
         self.grid_rowconfigure(3, weight=1)
         self.grid_columnconfigure(0, weight=2)
@@ -13,10 +26,13 @@ class ConceptsPage(ctk.CTkFrame):
         # 🔍 Search Entry
         self.search_entry = ctk.CTkEntry(self, placeholder_text="Search concepts...")
         self.search_entry.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="ew")
-        self.search_entry.bind("<KeyRelease>", self.search_topics)
+        self.search_entry.bind("<KeyRelease>", self.schedule_search)
 
-        # 📚 Horizontal Scrollable Topic Button Bar
-        self.topic_bar = ctk.CTkScrollableFrame(self, height=50, orientation="horizontal", fg_color="transparent")
+        # 📚 Horizontal topic bar: buttons are recycled, so thousands of topics cost a screenful
+        self.topic_bar = VirtualList(
+            self, height=56, orientation="horizontal", fg_color="transparent", row_size=TOPIC_BUTTON_SIZE,
+            create_row=lambda parent, size: ctk.CTkButton(parent, width=size - 12, height=32),
+            update_row=self.show_topic_button)
         self.topic_bar.grid(row=1, column=0, padx=20, pady=(0, 10), sticky="ew")
 
         # 📜 Main Content Text (tk.Text instead of CTkTextbox)
@@ -29,101 +45,198 @@ class ConceptsPage(ctk.CTkFrame):
         self.concepts_content.grid(row=0, column=0, sticky="nsew")
 
         # Add scrollbar
-        scrollbar = Scrollbar(self.content_frame, command=self.concepts_content.yview)
-        scrollbar.grid(row=0, column=1, sticky="ns")
-        self.concepts_content.config(yscrollcommand=scrollbar.set)
+        self.scrollbar = Scrollbar(self.content_frame, command=self.concepts_content.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.concepts_content.config(yscrollcommand=self.on_content_scroll)
+        self.concepts_content.bind("<Configure>", lambda event: self.schedule_render())
+
+        # Shared styles for every topic; blocks alternate between the even and odd pair
+        for parity, bg_color in (("even", "#1e1e1e"), ("odd", "#2c2c2c")):
+            self.concepts_content.tag_configure(f"header_{parity}", background=bg_color, foreground="cyan",
+                                                font=("Consolas", 14, "bold"))
+            self.concepts_content.tag_configure(f"body_{parity}", background=bg_color, foreground="white")
+        self.concepts_content.tag_configure("search_hit", background="#3a3a3a")
 
         # Internal state
-        self.topic_offsets = {}
-        self.topic_buttons = []
+        self.topic_lines = []
         self.topics = []
+        self.bodies = []
+        self.parities = []
+        self.rendered = set()
+        self.render_job = None
+        self.bundle = None
+        self.search_index = None
+        self.search_job = None
+        self.store_topics = None
+        self.store_error = None
 
         self.load_theory_content()
 
     def load_theory_content(self):
         self.concepts_content.configure(state="normal")
         self.concepts_content.delete("1.0", "end")
-        self.topic_offsets.clear()
 
-        # ✅ Use relative path to read concepts_raw.txt from db/
-        file_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "db", "concepts_raw.txt"))
+        # The compiled bundle has every title up front and each body behind an offset
+        self.bundle = open_bundle(db_path=self.db_path)
+        if self.bundle is not None:
+            self.show_topics(self.bundle.concept_titles(), [], self.bundle.concepts_digest, self.bundle.concepts)
+            return
+
+        # The bundle is being rebuilt; stream this one from the content store instead
+        self.concepts_content.insert("1.0", "Loading concepts...")
+        self.concepts_content.configure(state="disabled")
+        self.store_topics = self.store_error = None
+        threading.Thread(target=self.read_store, daemon=True).start()
+        self.poll_store()
 
-        if not os.path.exists(file_path):
-            self.concepts_content.insert("1.0", "❌ Error: db/concepts_raw.txt not found.")
+    def read_store(self):
+        try:
+            migrate(self.db_path)
+            self.store_topics = list(fetch_concepts(self.db_path))
+        except Exception as e:
+            self.store_error = e
+        finally:
+            close_connections()
+
+    def poll_store(self):
+        # The store is read on a background thread; poll until it's done.
+        if self.store_error is not None:
+            self.concepts_content.configure(state="normal")
+            self.concepts_content.delete("1.0", "end")
+            self.concepts_content.insert("1.0", f"❌ Error: could not load concepts ({self.store_error}).")
             self.concepts_content.configure(state="disabled")
             return
+        if self.store_topics is None:
+            self.after(50, self.poll_store)
+            return
+        topics = self.store_topics
+        self.show_topics([(block, title) for block, title, _ in topics], [body for _, _, body in topics],
+                         content_digest(json.dumps(topics)), lambda: topics)
 
-        with open(file_path, "r", encoding="utf-8") as f:
-            text = f.read()
-
-        blocks = re.split(r"-{10,}", text)
-        start_idx = 0
+    def show_topics(self, titles, bodies, digest, load_topics):
+        self.concepts_content.configure(state="normal")
+        self.concepts_content.delete("1.0", "end")
         self.topics.clear()
-
-        # Clear previous buttons
-        for btn in self.topic_buttons:
-            btn.destroy()
-        self.topic_buttons.clear()
-
-        for i, block in enumerate(blocks):
-            block = block.strip()
-            if not block:
-                continue
-
-            lines = block.splitlines()
-            topic_title = lines[0].strip()
-            topic_text = "\n".join(lines[1:]).strip()
-
+        self.bodies = bodies
+        self.parities.clear()
+        self.topic_lines.clear()
+        self.rendered.clear()
+
+        # Titles only, each followed by a one-line placeholder for its body, in a single insert
+        chunks = []
+        for n, (i, topic_title) in enumerate(titles):
+            parity = "even" if i % 2 == 0 else "odd"
             self.topics.append(topic_title)
-            bg_color = "#1e1e1e" if i % 2 == 0 else "#2c2c2c"
-            tag_header = f"header{i}"
-            tag_body = f"body{i}"
+            self.parities.append(parity)
+            self.topic_lines.append(2 * n + 1)
+            chunks += [f"{topic_title}\n", f"header_{parity}", "\n", f"body_{parity}"]
+        if chunks:
+            self.concepts_content.insert("end", *chunks)
+        self.concepts_content.configure(state="disabled")
+        self.topic_bar.set_items(list(range(len(self.topics))))
+        self.schedule_render()
 
-            self.topic_offsets[topic_title] = f"1.0+{start_idx}c"
+        # Index titles and bodies off the UI thread; searches before it's ready match titles only.
+        self.search_index = None
+        threading.Thread(target=self.build_index, args=(digest, load_topics), daemon=True).start()
 
-            header = f"{topic_title}\n"
-            body = f"{topic_text}\n\n"
+    def build_index(self, digest, load_topics):
+        self.search_index = get_index(digest, load_topics)
 
-            self.concepts_content.insert("end", header, tag_header)
-            self.concepts_content.insert("end", body, tag_body)
+    def body(self, topic):
+        if self.bundle is not None:
+            return self.bundle.concept_body(topic)
+        return self.bodies[topic]
 
-            start_idx += len(header + body)
+    def show_topic_button(self, button, topic):
+        button.configure(text=self.topics[topic][:30], command=lambda: self.jump_to(topic))
 
-            def make_jump(t=topic_title):
-                return lambda: self.scroll_to(self.topic_offsets[t])
+    def jump_to(self, topic, line=0):
+        self.render_topics(topic, topic + RENDER_AHEAD)
+        self.scroll_to(f"{self.topic_lines[topic] + line}.0")
 
-            btn = ctk.CTkButton(self.topic_bar, text=topic_title[:30], width=160, height=32, command=make_jump())
-            btn.pack(side="left", padx=6)
-            self.topic_buttons.append(btn)
+    def on_content_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.schedule_render()
 
-            # Styling works now
-            self.concepts_content.tag_configure(tag_header, background=bg_color, foreground="cyan", font=("Consolas", 14, "bold"))
-            self.concepts_content.tag_configure(tag_body, background=bg_color, foreground="white")
+    def schedule_render(self):
+        if self.render_job is None:
+            self.render_job = self.after_idle(self.render_visible)
 
-        self.concepts_content.configure(state="disabled")
+    def render_visible(self):
+        self.render_job = None
+        if not self.topics:
+            return
+        top = int(self.concepts_content.index("@0,0").split(".")[0])
+        bottom = int(self.concepts_content.index(f"@0,{self.concepts_content.winfo_height()}").split(".")[0])
+        first = bisect.bisect_right(self.topic_lines, top) - 1
+        last = bisect.bisect_right(self.topic_lines, bottom) - 1
+        self.render_topics(max(0, first - RENDER_AHEAD), last + RENDER_AHEAD)
+
+    def render_topics(self, first, last):
+        """Replace the placeholders of topics first..last (inclusive) with their bodies."""
+        pending = [n for n in range(max(0, first), min(last, len(self.topics) - 1) + 1) if n not in self.rendered]
+        if not pending:
+            return
+        content = self.concepts_content
+        # Keep the line at the top of the view in place while text is inserted above it
+        top = int(content.index("@0,0").split(".")[0])
+        shift = 0
+        content.configure(state="normal")
+        # Bottom-up, so each topic's line number is still valid when it is reached
+        for n in reversed(pending):
+            body = f"{self.body(n)}\n\n"
+            placeholder = self.topic_lines[n] + 1
+            content.delete(f"{placeholder}.0", f"{placeholder + 1}.0")
+            content.insert(f"{placeholder}.0", body, f"body_{self.parities[n]}")
+            added = body.count("\n") - 1
+            for later in range(n + 1, len(self.topic_lines)):
+                self.topic_lines[later] += added
+            if placeholder < top:
+                shift += added
+            self.rendered.add(n)
+        content.configure(state="disabled")
+        if shift:
+            content.yview(f"{top + shift}.0")
 
     def scroll_to(self, index):
-        # Calculate fraction to move scroll position
+        # Put the target line at the top; topics above may still be placeholders, so a
+        # fraction of the current content would land somewhere else once they render.
         try:
-         total_lines = int(self.concepts_content.index("end-1c").split('.')[0])
-         target_line = int(self.concepts_content.index(index).split('.')[0])
-         fraction = target_line / total_lines
-         self.concepts_content.yview_moveto(fraction)
+            self.concepts_content.yview(index)
         except Exception as e:
-         print(f"Scroll error: {e}")
-         self.concepts_content.see(index)  # Fallback
-    
+            print(f"Scroll error: {e}")
+            self.concepts_content.see(index)  # Fallback
+
+    def schedule_search(self, event=None):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DELAY_MS, self.search_topics)
+
     def search_topics(self, event=None):
-        query = self.search_entry.get().lower()
+        self.search_job = None
+        query = self.search_entry.get().strip()
+        self.concepts_content.tag_remove("search_hit", "1.0", "end")
+        if not query:
+            self.topic_bar.set_items(list(range(len(self.topics))))
+            return
 
-        for btn, topic in zip(self.topic_buttons, self.topics):
-            if query in topic.lower():
-                btn.configure(fg_color="#3a3a3a")
-                btn.pack(side="left", padx=6)
+        if self.search_index is not None:
+            hits = self.search_index.search(query)
+            matched = {hit.topic for hit in hits}
+            target = (hits[0].topic, hits[0].line) if hits else None
+        else:
+            matched = [n for n, topic in enumerate(self.topics) if query.lower() in topic.lower()]
+            target = (matched[0], 0) if matched else None
+        self.topic_bar.set_items(sorted(matched))
+
+        if target is not None:
+            # Jump to the best matching paragraph, not just its topic
+            topic, line = target
+            self.jump_to(topic, line)
+            start = self.topic_lines[topic] + line
+            if line == 0:
+                end = f"{start}.end"
             else:
-                btn.pack_forget()
-
-        for topic in self.topics:
-            if query in topic.lower():
-                self.scroll_to(self.topic_offsets[topic])
-                break
+                end = self.concepts_content.search(r"^\s*$", f"{start}.0", "end", regexp=True) or "end"
+            self.concepts_content.tag_add("search_hit", f"{start}.0", end)
@@ -1,11 +1,18 @@
 import customtkinter as ctk
 from tkinter import Text, Scrollbar, RIGHT, Y, LEFT, BOTH
-from pygments import lex
-from pygments.lexers import CLexer
-from pygments.token import Token
-import json
 import os 
 from tkinter import messagebox
+from utils.db_utils import DB_PATH
+from utils.example_store import DIFFICULTIES, ExampleStore
+from utils.example_tokens import ExampleTokenCache
+from utils.virtual_list import VirtualList
+
+# Wait this long after the last keystroke before searching
+SEARCH_DELAY_MS = 150
+ALL_LEVELS = "All levels"
+ALL_TAGS = "All tags"
+# Shown when the examples file can't be read
+FALLBACK_CODE = "#include <stdio.h>\nint main() {\n    printf(\"Hello, World!\");\n    return 0;\n}"
 
 # Tooltips dictionary for C keywords
 TOOLTIP_KEYWORDS = {
@@ -78,13 +85,17 @@ TOOLTIP_KEYWORDS = {
 
 
 class LearningModulePage(ctk.CTkFrame):
-    def __init__(self, parent):
+    def __init__(self, parent, db_path=DB_PATH):
         super().__init__(parent )
 
         self.code_panel = None
         self.line_numbers = None
         self.output_sidebar = None
-        self.examples = self.load_examples()
+        self.search_job = None
+        # Indexed from the content store, so imported packs show up; code bodies are only read when opened
+        self.store = ExampleStore(db_path).start()
+        # Token ranges for every example, lexed once in the background and cached on disk
+        self.token_cache = ExampleTokenCache(self.examples_path()).start()
 
         self.build_ui()
         self.populate_examples()
@@ -109,6 +120,7 @@ class LearningModulePage(ctk.CTkFrame):
         self.code_panel = Text(editor_frame, font=("JetBrains Mono", 14), bg="#1e1e1e", fg="white",
                                insertbackground="white", bd=0, wrap="none")
         self.code_panel.pack(side=LEFT, fill=BOTH, expand=True)
+        self.define_tags()
 
         scrollbar = Scrollbar(editor_frame, command=lambda *args: (
             self.code_panel.yview(*args), self.line_numbers.yview(*args)))
@@ -116,33 +128,76 @@ class LearningModulePage(ctk.CTkFrame):
         self.code_panel.config(yscrollcommand=scrollbar.set)
         self.line_numbers.config(yscrollcommand=scrollbar.set)
 
-        # Output Sidebar for buttons
-        self.output_sidebar = ctk.CTkScrollableFrame(body_frame, width=300, label_text="Syntax Examples")
-        self.output_sidebar.pack(side=RIGHT, fill="y", padx=(10, 0))
+        # Output Sidebar: search, filters and a virtualized list of examples
+        sidebar = ctk.CTkFrame(body_frame, width=300)
+        sidebar.pack(side=RIGHT, fill="y", padx=(10, 0))
+        sidebar.pack_propagate(False)
+        ctk.CTkLabel(sidebar, text="Syntax Examples", font=ctk.CTkFont(weight="bold")).pack(pady=(8, 4))
+
+        self.search_var = ctk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self.schedule_search())
+        ctk.CTkEntry(sidebar, textvariable=self.search_var,
+                     placeholder_text="Search titles and code").pack(fill="x", padx=10, pady=(0, 6))
+
+        filter_row = ctk.CTkFrame(sidebar, fg_color="transparent")
+        filter_row.pack(fill="x", padx=10)
+        self.level_menu = ctk.CTkOptionMenu(filter_row, values=[ALL_LEVELS] + DIFFICULTIES, width=130,
+                                            command=lambda value: self.apply_search())
+        self.level_menu.pack(side=LEFT, padx=(0, 6))
+        self.tag_menu = ctk.CTkOptionMenu(filter_row, values=[ALL_TAGS], width=130,
+                                          command=lambda value: self.apply_search())
+        self.tag_menu.pack(side=LEFT)
+
+        self.result_label = ctk.CTkLabel(sidebar, text="Loading examples...", anchor="w")
+        self.result_label.pack(fill="x", padx=10, pady=(4, 0))
+
+        self.output_sidebar = VirtualList(
+            sidebar, row_size=42, fg_color="transparent",
+            create_row=lambda parent, height: ctk.CTkButton(parent, height=height - 6, anchor="w"),
+            update_row=self.show_example_row)
+        self.output_sidebar.pack(fill="both", expand=True, padx=(10, 0), pady=8)
+
+    def show_example_row(self, button, example):
+        example_id, title = example[0], example[1]
+        button.configure(text=title, command=lambda: self.open_example(example_id))
 
     def populate_examples(self):
-        for example in self.examples:
-            btn = ctk.CTkButton(
-                self.output_sidebar,
-                text=example.get("title", "Untitled"),
-                command=lambda ex=example: self.load_code(ex["code"])
-            )
-            btn.pack(pady=5, padx=10, anchor="w")
-
-    def load_examples(self):
+        # The index is built on a background thread; poll until it's ready.
+        if not self.store.ready:
+            self.after(50, self.populate_examples)
+            return
+        if self.store.error is not None:
+            print(f"Error loading examples: {self.store.error}")
+            self.result_label.configure(text="Examples unavailable")
+            self.load_code(FALLBACK_CODE)
+            return
+        self.tag_menu.configure(values=[ALL_TAGS] + self.store.tags())
+        self.apply_search()
+
+    def schedule_search(self):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DELAY_MS, self.apply_search)
+
+    def apply_search(self):
+        self.search_job = None
+        if not self.store.ready:
+            return
+        level = self.level_menu.get()
+        tag = self.tag_menu.get()
+        results = self.store.search(self.search_var.get(),
+                                    tag=None if tag == ALL_TAGS else tag,
+                                    difficulty=None if level == ALL_LEVELS else level)
+        self.result_label.configure(text=f"{len(results)} of {self.store.count()} examples")
+        self.output_sidebar.set_items(results)
+
+    def open_example(self, example_id):
+        self.load_code(self.store.code(example_id))
+
+    def examples_path(self):
         # Safely resolve JSON path relative to this file
         json_path = os.path.join(os.path.dirname(__file__), "..", "assets", "c_code_examples_extended.json")
-        json_path = os.path.abspath(json_path)
-
-        try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading examples: {e}")
-            return [{
-                "title": "Hello World",
-                "code": "#include <stdio.h>\nint main() {\n    printf(\"Hello, World!\");\n    return 0;\n}"
-            }]
+        return os.path.abspath(json_path)
 
     def load_code(self, code_text):
         self.code_panel.configure(state="normal")
@@ -152,23 +207,12 @@ class LearningModulePage(ctk.CTkFrame):
 
         self.code_panel.insert("1.0", code_text)
 
-        lines = code_text.split("\n")
-        for i in range(1, len(lines) + 1):
-            self.line_numbers.insert("end", f"{i}\n")
-
-        self.define_tags()
+        line_count = code_text.count("\n") + 1
+        self.line_numbers.insert("1.0", "\n".join(str(i) for i in range(1, line_count + 1)) + "\n")
 
-        start_index = 0
-        for token_type, token_str in lex(code_text, CLexer()):
-            if token_str == "\n":
-                start_index += 1
-                continue
-            pos = f"1.0+{start_index}c"
-            end_pos = f"1.0+{start_index + len(token_str)}c"
-            tag_name = str(token_type)
-            if tag_name.startswith("Token"):
-                self.code_panel.tag_add(tag_name, pos, end_pos)
-            start_index += len(token_str)
+        # One tag_add per token type with every range precomputed
+        for tag_name, indices in self.token_cache.ranges(code_text).items():
+            self.code_panel.tag_add(tag_name, *indices)
 
         self.code_panel.configure(state="disabled")
         self.line_numbers.configure(state="disabled")
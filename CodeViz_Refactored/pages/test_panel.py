@@ -0,0 +1,139 @@
+import customtkinter as ctk
+from tkinter import filedialog
+from utils.runner import Job
+from utils.testcases import TestCase, find_cases, run_cases, PASS, FAIL, TIMEOUT, ERROR
+
+POLL_MS = 50
+
+STATUS_COLORS = {
+    PASS: "#98C379",
+    FAIL: "#E06C75",
+    TIMEOUT: "#E5C07B",
+    ERROR: "#E06C75",
+}
+
+
+class TestPanel(ctk.CTkToplevel):
+    """Attach input/expected-output pairs to the program in the editor and run them all."""
+
+    def __init__(self, parent, get_code, timeout):
+        super().__init__(parent)
+        self.title("Test Cases")
+        self.geometry("720x480")
+        self.get_code = get_code
+        self.timeout = timeout
+        self.cases = []
+        self.rows = {}
+        self.job = None
+        self.counts = {}
+        self._after_id = None
+
+        button_row = ctk.CTkFrame(self, fg_color="transparent")
+        button_row.pack(fill="x", padx=10, pady=10)
+        ctk.CTkButton(button_row, text="Add Case", width=100, command=self.add_case).pack(side="left", padx=5)
+        ctk.CTkButton(button_row, text="Add Folder", width=100, command=self.add_folder).pack(side="left", padx=5)
+        self.run_button = ctk.CTkButton(button_row, text="Run All", width=100, command=self.run_all)
+        self.run_button.pack(side="left", padx=5)
+        self.stop_button = ctk.CTkButton(button_row, text="Stop", width=80, command=self.stop, state="disabled")
+        self.stop_button.pack(side="left", padx=5)
+        ctk.CTkButton(button_row, text="Clear", width=80, command=self.clear).pack(side="left", padx=5)
+
+        self.summary_label = ctk.CTkLabel(self, text="No test cases yet", anchor="w")
+        self.summary_label.pack(fill="x", padx=15)
+
+        self.case_list = ctk.CTkScrollableFrame(self)
+        self.case_list.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.bind("<Destroy>", self._on_destroy, add="+")
+
+    def add_case(self):
+        input_path = filedialog.askopenfilename(parent=self, title="Program input")
+        if not input_path:
+            return
+        expected_path = filedialog.askopenfilename(parent=self, title="Expected output")
+        if expected_path:
+            self.add_cases([TestCase(input_path, expected_path)])
+
+    def add_folder(self):
+        folder = filedialog.askdirectory(parent=self, title="Folder with .in/.out pairs")
+        if folder:
+            self.add_cases(find_cases(folder))
+
+    def add_cases(self, cases):
+        for case in cases:
+            self.cases.append(case)
+            row = ctk.CTkLabel(self.case_list, text=f"{case.name}   (not run)", anchor="w",
+                               font=("Consolas", 12))
+            row.pack(fill="x", padx=5, pady=1)
+            self.rows[case] = row
+        self.summary_label.configure(text=f"{len(self.cases)} test case{'s' if len(self.cases) != 1 else ''}")
+
+    def clear(self):
+        if self.job is not None:
+            return
+        for row in self.rows.values():
+            row.destroy()
+        self.cases.clear()
+        self.rows.clear()
+        self.summary_label.configure(text="No test cases yet")
+
+    def run_all(self):
+        if self.job is not None or not self.cases:
+            return
+        code = self.get_code()
+        cases = list(self.cases)
+        for case in cases:
+            self.rows[case].configure(text=f"{case.name}   running...", text_color=("black", "white"))
+        self.counts = {PASS: 0, FAIL: 0, TIMEOUT: 0, ERROR: 0}
+        self.job = Job(lambda job: run_cases(job, code, cases, self.timeout), timeout=self.timeout).start()
+        self.run_button.configure(state="disabled")
+        self.stop_button.configure(state="normal")
+        self.poll()
+
+    def stop(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def _on_destroy(self, event):
+        # Closing the panel mid-run must not leave the cases running, or poll() firing on dead widgets
+        if event.widget is not self:
+            return
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+
+    def poll(self):
+        self._after_id = None
+        for kind, payload in self.job.poll():
+            if kind == "status":
+                self.summary_label.configure(text=payload)
+            elif kind == "case":
+                self.show_result(payload)
+            else:
+                self.finish(kind, payload)
+                return
+        self._after_id = self.after(POLL_MS, self.poll)
+
+    def show_result(self, result):
+        self.counts[result.status] += 1
+        text = f"{result.case.name}   {result.status.upper():8} {result.wall_time * 1000:8.1f} ms"
+        if result.detail:
+            text += f"   {result.detail}"
+        self.rows[result.case].configure(text=text, text_color=STATUS_COLORS[result.status])
+
+    def finish(self, kind, payload):
+        self.job = None
+        self.run_button.configure(state="normal")
+        self.stop_button.configure(state="disabled")
+        if kind == "error":
+            self.summary_label.configure(text=f"Error: {payload}")
+        elif payload is not None:
+            message = payload.stderr.strip() or payload.exit_status()
+            self.summary_label.configure(text=f"Compilation failed: {message.splitlines()[0]}")
+        else:
+            self.summary_label.configure(
+                text=f"{self.counts[PASS]} passed, {self.counts[FAIL]} failed, "
+                     f"{self.counts[TIMEOUT]} timed out, {self.counts[ERROR]} errors")
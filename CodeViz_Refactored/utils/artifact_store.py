@@ -0,0 +1,228 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# Total size of build artifacts kept under Output/ before the least recently used are evicted
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+# Untracked uuid-named files younger than this may belong to a session that is still starting up
+ORPHAN_MIN_AGE = 60 * 60
+
+INDEX_NAME = ".artifacts.json"
+# Held while the index is read, changed and written back; every editor process on the tree takes it
+LOCK_NAME = ".artifacts.lock"
+
+SOURCE = "source"
+EXECUTABLE = "executable"
+CLASSES = "classes"
+SAVED = "saved"
+
+# Temp names CodeEditor generates: "<uuid4>" plus an optional extension
+_TEMP_NAME_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}(\.\w+)?$")
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        # Exists but isn't ours (or we can't tell): treat as alive.
+        return True
+    return True
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive lock on `path` across processes, blocking until it's free."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            while True:
+                try:
+                    # Retries for about ten seconds before giving up with OSError
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ArtifactStore:
+    """
+    Index of the files CodeEditor writes under Output/: what each one is,
+    which session wrote it and when it was last used. Build artifacts are
+    evicted least recently used first once they exceed `max_bytes`;
+    artifacts of crashed sessions are removed at startup by clean_orphans().
+
+    Files recorded as SAVED (and any file the store never indexed that
+    doesn't carry a generated temp name) are never deleted. Several editor
+    processes may share one root: every change to the index happens under
+    a file lock, and a session's artifacts are only evicted by another
+    once it has closed or its process has died.
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES, session=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.session = session or str(uuid.uuid4())
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self.lock_path = os.path.join(root, LOCK_NAME)
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        # The thread lock first: flock() locks are per open file, not per thread.
+        with self._lock, _file_lock(self.lock_path):
+            yield
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, index):
+        staging = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(staging, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+        os.replace(staging, self.index_path)
+
+    def _relative(self, path):
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(self.root))
+        if relative.startswith(os.pardir):
+            return None
+        return relative.replace(os.sep, "/")
+
+    def register(self, path, kind):
+        """Record a file this session wrote (or just used) under root."""
+        relative = self._relative(path)
+        if relative is None:
+            return
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._locked():
+            index = self._load()
+            entry = index.get(relative, {})
+            # Once saved by the user, a file stays protected.
+            if entry.get("kind") != SAVED:
+                entry["kind"] = kind
+            entry.update(session=self.session, pid=os.getpid(), closed=False,
+                         size=size, last_used=time.time())
+            index[relative] = entry
+            self._save(index)
+        if kind != SAVED:
+            self.evict()
+
+    def touch(self, path):
+        relative = self._relative(path)
+        with self._locked():
+            index = self._load()
+            if relative in index:
+                index[relative]["last_used"] = time.time()
+                self._save(index)
+
+    def _remove(self, relative, index):
+        try:
+            os.remove(os.path.join(self.root, relative))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # Still running on Windows; try again next time.
+            return 0
+        return index.pop(relative, {}).get("size", 0)
+
+    def evict(self):
+        """Drop least recently used artifacts until under budget. Returns bytes reclaimed."""
+        with self._locked():
+            index = self._load()
+            candidates = sorted((entry["last_used"], relative) for relative, entry in index.items()
+                                if entry["kind"] != SAVED)
+            total = sum(index[relative]["size"] for _, relative in candidates)
+            reclaimed = 0
+            for _, relative in candidates:
+                if total <= self.max_bytes:
+                    break
+                entry = index[relative]
+                if entry["session"] == self.session or (not entry.get("closed") and _pid_alive(entry["pid"])):
+                    # Its window may still run it.
+                    continue
+                freed = self._remove(relative, index)
+                total -= freed
+                reclaimed += freed
+            self._save(index)
+            return reclaimed
+
+    def clean_orphans(self):
+        """
+        Remove artifacts of sessions that died without closing, and
+        generated temp files the index never heard of. Returns
+        (files removed, bytes reclaimed).
+        """
+        removed, reclaimed = 0, 0
+        with self._locked():
+            index = self._load()
+            for relative, entry in list(index.items()):
+                if not os.path.exists(os.path.join(self.root, relative)):
+                    del index[relative]
+                elif (entry["kind"] != SAVED and not entry.get("closed")
+                      and entry["session"] != self.session and not _pid_alive(entry["pid"])):
+                    reclaimed += self._remove(relative, index)
+                    removed += 1
+
+            cutoff = time.time() - ORPHAN_MIN_AGE
+            for folder, _, files in os.walk(self.root):
+                for name in files:
+                    path = os.path.join(folder, name)
+                    relative = self._relative(path)
+                    if relative in index or not _TEMP_NAME_RE.match(name):
+                        continue
+                    try:
+                        stat = os.stat(path)
+                        if stat.st_mtime > cutoff:
+                            continue
+                        os.remove(path)
+                    except OSError:
+                        continue
+                    removed += 1
+                    reclaimed += stat.st_size
+            self._save(index)
+        return removed, reclaimed
+
+    def close_session(self):
+        """Mark this session's artifacts as cleanly released, leaving them to LRU eviction."""
+        with self._locked():
+            index = self._load()
+            for entry in index.values():
+                if entry["session"] == self.session:
+                    entry["closed"] = True
+            self._save(index)
+
+    def total_size(self):
+        with self._locked():
+            return sum(entry["size"] for entry in self._load().values() if entry["kind"] != SAVED)
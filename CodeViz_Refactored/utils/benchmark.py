@@ -0,0 +1,90 @@
+import math
+import os
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from utils.build_cache import compile_source
+from utils.workspace import Workspace
+
+OPT_LEVELS = ("-O0", "-O2", "-O3")
+DEFAULT_RUNS = 10
+DEFAULT_WARMUP = 2
+
+
+class _Discard:
+    def write(self, text):
+        pass
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(len(samples) * fraction))
+    return samples[rank - 1]
+
+
+class SampleStats:
+    def __init__(self, samples):
+        samples = sorted(samples)
+        self.min = samples[0]
+        self.median = statistics.median(samples)
+        self.p95 = percentile(samples, 0.95)
+        self.stdev = statistics.stdev(samples) if len(samples) > 1 else 0.0
+
+
+class BenchmarkRow:
+    def __init__(self, level, wall, cpu=None, error=None):
+        self.level = level
+        self.wall = wall
+        self.cpu = cpu
+        self.error = error
+
+
+def run_benchmark(job, source, levels=OPT_LEVELS, runs=DEFAULT_RUNS, warmup=DEFAULT_WARMUP):
+    """
+    Build `source` at every optimisation level in parallel, then run each
+    build `warmup` + `runs` times one after another so runs don't compete
+    for the CPU. Returns a BenchmarkRow per level.
+    """
+    job.status("Building " + ", ".join(levels) + "...")
+    with ThreadPoolExecutor(max_workers=min(len(levels), os.cpu_count() or 1)) as pool:
+        builds = list(pool.map(lambda level: compile_source(job, source, [level]), levels))
+
+    rows = []
+    with Workspace() as workspace:
+        for level, (executable, failed) in zip(levels, builds):
+            if failed is not None:
+                rows.append(BenchmarkRow(level, None, error=failed.stderr.strip() or failed.exit_status()))
+                continue
+            walls, cpus = [], []
+            for i in range(warmup + runs):
+                if job.cancelled:
+                    return rows
+                job.status(f"Running {level} ({max(0, i - warmup + 1)}/{runs})")
+                result = job.run_process([executable], cwd=workspace.path, output=_Discard())
+                if not result.ok:
+                    rows.append(BenchmarkRow(level, None, error=result.exit_status()))
+                    break
+                if i >= warmup:
+                    walls.append(result.wall_time)
+                    if result.cpu_time is not None:
+                        cpus.append(result.cpu_time)
+            else:
+                rows.append(BenchmarkRow(level, SampleStats(walls), SampleStats(cpus) if cpus else None))
+    return rows
+
+
+def format_table(rows, runs=DEFAULT_RUNS):
+    def cells(stats):
+        if stats is None:
+            return "n/a".rjust(35)
+        return " ".join(f"{value * 1000:8.2f}" for value in (stats.min, stats.median, stats.p95, stats.stdev))
+
+    lines = [
+        f"{runs} runs per level, times in ms",
+        f"{'':6}{'wall: min':>9} {'median':>8} {'p95':>8} {'stdev':>8}   {'cpu: min':>8} {'median':>8} {'p95':>8} {'stdev':>8}",
+    ]
+    for row in rows:
+        if row.error:
+            lines.append(f"{row.level:6}failed: {row.error.splitlines()[0]}")
+        else:
+            lines.append(f"{row.level:6}{cells(row.wall)}   {cells(row.cpu)}")
+    return "\n".join(lines)
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import shutil
+import sys
+import threading
+import uuid
+from utils.paths import user_cache_dir
+from utils.toolchains import get_registry
+from utils.workspace import Workspace
+
+# Total size of cached executables before the least recently used are evicted
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+EXE_SUFFIX = ".exe" if sys.platform == "win32" else ""
+# Libraries every C program is linked against; math.h's functions live in libm on glibc
+LINK_FLAGS = ["-lm"]
+
+
+def compiler_version(compiler):
+    """First line of `compiler --version`, from the toolchain registry's cache."""
+    return get_registry().version(compiler)
+
+
+class BuildCache:
+    """
+    Content-addressed store of built executables. Entries are keyed on the
+    source text, compiler path and version, and flags; the file mtime is
+    bumped on every hit so eviction can drop the least recently used first.
+    """
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root or user_cache_dir("builds")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, source, compiler, flags=()):
+        digest = hashlib.sha256()
+        for part in (source, compiler, compiler_version(compiler), *flags):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.root, key + EXE_SUFFIX)
+
+    def lookup(self, key):
+        path = self.path_for(key)
+        with self._lock:
+            try:
+                os.utime(path)
+            except OSError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return path
+
+    def store(self, key, built_path):
+        """Move a freshly built executable into the cache and return its cached path."""
+        path = self.path_for(key)
+        staging = os.path.join(self.root, f".{uuid.uuid4().hex}{EXE_SUFFIX}")
+        shutil.move(built_path, staging)
+        os.replace(staging, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.root):
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    # Still running on Windows; try again next time.
+                    pass
+
+    def stats(self):
+        return f"build cache: {self.hits} hit{'s' if self.hits != 1 else ''}, {self.misses} miss{'es' if self.misses != 1 else ''}"
+
+
+_default = None
+
+
+def get_build_cache():
+    global _default
+    if _default is None:
+        _default = BuildCache()
+    return _default
+
+
+def compile_source(job, source, flags=(), compiler=None, cache=None):
+    """
+    Build C `source` through the build cache using job.run_process().
+    Returns (executable, None) on success or (None, failed ProcessResult).
+    """
+    cache = cache or get_build_cache()
+    compiler = compiler or get_registry().path("gcc") or "gcc"
+    key = cache.key(source, compiler, [*flags, *LINK_FLAGS])
+    executable = cache.lookup(key)
+    if executable is not None:
+        return executable, None
+
+    with Workspace() as workspace:
+        source_path = workspace.artifact(".c")
+        with open(source_path, "w", encoding="utf-8") as f:
+            f.write(source)
+        built = workspace.artifact(EXE_SUFFIX)
+        result = job.run_process([compiler, os.path.basename(source_path), "-o", built, *flags, *LINK_FLAGS],
+                                 cwd=workspace.path)
+        if not result.ok:
+            return None, result
+        return cache.store(key, built), None
@@ -0,0 +1,266 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from utils import db_utils
+from utils.db_utils import DB_PATH, close_connections, content_version, fetch_applications, fetch_concepts, fetch_examples, flat_stamps, migrate
+from utils.paths import user_cache_dir
+from utils.search_index import content_digest
+
+# Bundle file inside the user cache directory
+BUNDLE_NAME = "content.bundle"
+
+MAGIC = b"CVZB"
+FORMAT_VERSION = 2
+# magic, format version, index offset, index length
+HEADER = struct.Struct("<4sIQQ")
+# One offset table entry: record offset, record length
+ENTRY = struct.Struct("<QI")
+
+# Sections: "concept_titles" and "example_titles" are one JSON record each (the
+# lists a page shows up front); "concept_bodies" holds one UTF-8 text record per
+# topic; "examples" and "applications" one JSON record per item.
+SECTIONS = ("concept_titles", "concept_bodies", "example_titles", "examples", "applications")
+
+
+def read_store(db_path=DB_PATH):
+    """
+    Bring the content store up to date with the flat files, then read it:
+    (version, topics, examples, applications, concepts digest).
+    """
+    migrate(db_path)
+    # Read before the rows, so content imported meanwhile makes the bundle stale rather than lost
+    version = content_version(db_path)
+    topics = list(fetch_concepts(db_path))
+    digest = content_digest(json.dumps(topics))
+    return version, topics, list(fetch_examples(db_path)), list(fetch_applications(db_path)), digest
+
+
+def bundle_path():
+    return os.path.join(user_cache_dir(), BUNDLE_NAME)
+
+
+def build_bundle(path=None, db_path=DB_PATH):
+    """
+    Compile the concepts, examples and application cards in the content
+    store into one file: a fixed header, the records back to back, then a
+    JSON index holding the store's content version, the flat-file stamps
+    and, per section, where its offset table starts. Written to a temp file
+    and renamed into place.
+    """
+    path = path or bundle_path()
+    stamps = flat_stamps()
+    version, topics, examples, applications, digest = read_store(db_path)
+    records = {
+        "concept_titles": [json.dumps([[number, title] for number, title, _ in topics]).encode("utf-8")],
+        "concept_bodies": [body.encode("utf-8") for _, _, body in topics],
+        "example_titles": [json.dumps([[example.get("title", "Untitled"), example.get("difficulty"),
+                                        example.get("tags") or []] for example in examples]).encode("utf-8")],
+        "examples": [json.dumps(example).encode("utf-8") for example in examples],
+        "applications": [json.dumps(item).encode("utf-8") for item in applications],
+    }
+
+    staging = f"{path}.{os.getpid()}.tmp"
+    with open(staging, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        sections = {}
+        for name in SECTIONS:
+            entries = []
+            for record in records[name]:
+                entries.append(ENTRY.pack(f.tell(), len(record)))
+                f.write(record)
+            sections[name] = {"table": f.tell(), "count": len(entries)}
+            f.write(b"".join(entries))
+        index = json.dumps({"version": version, "sources": stamps, "concepts_sha1": digest,
+                            "sections": sections}).encode("utf-8")
+        index_offset = f.tell()
+        f.write(index)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, index_offset, len(index)))
+    os.replace(staging, path)
+    return path
+
+
+class ContentBundle:
+    """
+    Read-only view of a built bundle through mmap. Every record is found
+    through its section's offset table, so reading one topic body or one
+    example touches only that record's bytes.
+    """
+
+    def __init__(self, path=None, db_path=DB_PATH):
+        path = path or bundle_path()
+        self.path = path
+        self.db_path = db_path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, index_offset, index_length = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} content bundle")
+            self.index = json.loads(self._map[index_offset:index_offset + index_length])
+        except (struct.error, ValueError):
+            self.close()
+            raise
+
+    def close(self):
+        self._map.close()
+
+    def is_fresh(self):
+        """
+        Whether the store still holds what the bundle was built from, and no
+        flat file has changed since (which the next migrate() would import).
+        """
+        return (self.index.get("sources") == flat_stamps()
+                and self.index.get("version") == content_version(self.db_path))
+
+    @property
+    def concepts_digest(self):
+        return self.index["concepts_sha1"]
+
+    def count(self, section):
+        return self.index["sections"][section]["count"]
+
+    def record(self, section, number):
+        table = self.index["sections"][section]
+        if not 0 <= number < table["count"]:
+            raise IndexError(f"{section} has no record {number}")
+        offset, length = ENTRY.unpack_from(self._map, table["table"] + number * ENTRY.size)
+        return self._map[offset:offset + length]
+
+    def concept_titles(self):
+        """(block number, title) of every topic."""
+        return [tuple(item) for item in json.loads(self.record("concept_titles", 0))]
+
+    def concept_body(self, number):
+        return self.record("concept_bodies", number).decode("utf-8")
+
+    def concepts(self):
+        """Every topic as (block number, title, body), like split_topics()."""
+        return [(block, title, self.concept_body(n)) for n, (block, title) in enumerate(self.concept_titles())]
+
+    def example_titles(self):
+        return [tuple(item) for item in json.loads(self.record("example_titles", 0))]
+
+    def example(self, number):
+        return json.loads(self.record("examples", number))
+
+    def applications(self):
+        return [json.loads(self.record("applications", n)) for n in range(self.count("applications"))]
+
+
+_regenerating = threading.Lock()
+
+
+def regenerate(path=None, db_path=DB_PATH):
+    """Rebuild the bundle on a background thread, unless a rebuild is already running."""
+    if not _regenerating.acquire(blocking=False):
+        return
+
+    def work():
+        try:
+            build_bundle(path, db_path)
+        except Exception as e:
+            print(f"Content bundle rebuild failed: {e}")
+        finally:
+            close_connections()
+            _regenerating.release()
+
+    threading.Thread(target=work, daemon=True).start()
+
+
+def open_bundle(path=None, db_path=DB_PATH):
+    """
+    The bundle if it exists and matches the content store, else None after
+    starting a rebuild in the background; callers then read the store this
+    time.
+    """
+    try:
+        bundle = ContentBundle(path, db_path)
+    except (OSError, ValueError):
+        regenerate(path, db_path)
+        return None
+    if not bundle.is_fresh():
+        bundle.close()
+        regenerate(path, db_path)
+        return None
+    return bundle
+
+
+def benchmark():
+    import subprocess
+    import sys
+    import tempfile
+    from utils.search_index import split_topics
+
+    # What the pages used to do on the UI thread before their first paint, and what they do now.
+    # Each runs in a fresh interpreter and times itself, so imports don't count.
+    raw = ("import json, re, time\n"
+           "started = time.perf_counter()\n"
+           "text = open(r'{concepts}', encoding='utf-8').read()\n"
+           "topics = [b.strip() for b in re.split(r'-{{10,}}', text) if b.strip()]\n"
+           "examples = json.load(open(r'{examples}', encoding='utf-8'))\n"
+           "print(time.perf_counter() - started)\n")
+    bundled = ("import time\n"
+               "from utils.content_bundle import ContentBundle\n"
+               "started = time.perf_counter()\n"
+               "bundle = ContentBundle(r'{bundle}', r'{db}')\n"
+               "bundle.is_fresh()\n"
+               "titles = bundle.concept_titles()\n"
+               "examples = bundle.example_titles()\n"
+               "first = bundle.concept_body(0)\n"
+               "print(time.perf_counter() - started)\n")
+
+    def cold_ms(code, runs=15):
+        samples = []
+        for _ in range(runs):
+            result = subprocess.run([sys.executable, "-c", code], cwd=db_utils.BASE_DIR, check=True,
+                                    capture_output=True, text=True)
+            samples.append(float(result.stdout))
+        return sorted(samples)[len(samples) // 2] * 1000
+
+    originals = db_utils.CONCEPTS_PATH, db_utils.EXAMPLES_PATH
+    with open(db_utils.CONCEPTS_PATH, "r", encoding="utf-8") as f:
+        concepts_text = f.read()
+    with open(db_utils.EXAMPLES_PATH, "r", encoding="utf-8") as f:
+        examples = json.load(f)
+    with tempfile.TemporaryDirectory() as folder:
+        try:
+            for copies in (1, 100):
+                # Distinct titles, or the store would fold the copies into one
+                concepts = os.path.join(folder, f"concepts_{copies}.txt")
+                with open(concepts, "w", encoding="utf-8") as f:
+                    f.write(concepts_text if copies == 1 else "".join(
+                        f"{title} ({n + 1})\n{body}\n{'-' * 40}\n"
+                        for n in range(copies) for _, title, body in split_topics(concepts_text)))
+                examples_path = os.path.join(folder, f"examples_{copies}.json")
+                with open(examples_path, "w", encoding="utf-8") as f:
+                    json.dump([dict(example, title=f"{example.get('title')} ({n + 1})")
+                               for n in range(copies) for example in examples], f)
+                db_utils.CONCEPTS_PATH, db_utils.EXAMPLES_PATH = concepts, examples_path
+                path = os.path.join(folder, f"content_{copies}.bundle")
+                db_path = os.path.join(folder, f"content_{copies}.db")
+                build_bundle(path, db_path)
+
+                before = cold_ms(raw.format(concepts=concepts, examples=examples_path))
+                after = cold_ms(bundled.format(bundle=path, db=db_path))
+                print(f"{copies:3}x content ({os.path.getsize(path) / 1024:7.0f} KB bundle): "
+                      f"raw sources {before:6.1f} ms, bundle {after:5.1f} ms")
+        finally:
+            db_utils.CONCEPTS_PATH, db_utils.EXAMPLES_PATH = originals
+            db_utils.close_connections()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m utils.content_bundle",
+                                     description="Compile concepts, examples and application cards into the content bundle.")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare loading from the raw sources and from a bundle, at 1x and 100x content")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark()
+    else:
+        path = build_bundle()
+        print(f"wrote {path} ({os.path.getsize(path) / 1024:.0f} KB)")
@@ -1,15 +1,381 @@
-import sqlite3
+import hashlib
+import json
 import os
+import sqlite3
+import threading
+import uuid
+from utils.search_index import split_topics
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, "db", "content.db")
+CONCEPTS_PATH = os.path.join(BASE_DIR, "db", "concepts_raw.txt")
+EXAMPLES_PATH = os.path.join(BASE_DIR, "assets", "c_code_examples_extended.json")
+APPLICATIONS_PATH = os.path.join(BASE_DIR, "assets", "applications.json")
+# Where the application cards were read from before they moved into their own JSON asset
+LEGACY_APPLICATIONS_SOURCE = "pages/applications.py"
+
+# Bumped whenever SCHEMA changes; stored in PRAGMA user_version
+SCHEMA_VERSION = 5
+# Rows per page for the paginated accessors
+PAGE_SIZE = 50
+# Prepared statements each connection keeps compiled
+STATEMENT_CACHE = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY,
+    stamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS concepts (
+    id INTEGER PRIMARY KEY,
+    block INTEGER NOT NULL,
+    topic TEXT NOT NULL,
+    content TEXT NOT NULL,
+    source TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS examples (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    output_image TEXT,
+    code TEXT NOT NULL,
+    source TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE
+);
+CREATE INDEX IF NOT EXISTS examples_by_difficulty ON examples (difficulty, id);
+-- Full-text index over the examples table, kept in step with it by the triggers below
+CREATE VIRTUAL TABLE IF NOT EXISTS examples_fts USING fts5(
+    title, code, tags, content='examples', content_rowid='id', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS examples_fts_insert AFTER INSERT ON examples BEGIN
+    INSERT INTO examples_fts (rowid, title, code, tags) VALUES (new.id, new.title, new.code, new.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS examples_fts_delete AFTER DELETE ON examples BEGIN
+    INSERT INTO examples_fts (examples_fts, rowid, title, code, tags)
+    VALUES ('delete', old.id, old.title, old.code, old.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS examples_fts_update AFTER UPDATE ON examples BEGIN
+    INSERT INTO examples_fts (examples_fts, rowid, title, code, tags)
+    VALUES ('delete', old.id, old.title, old.code, old.tags);
+    INSERT INTO examples_fts (rowid, title, code, tags) VALUES (new.id, new.title, new.code, new.tags);
+END;
+CREATE TABLE IF NOT EXISTS applications (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    category TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    use TEXT NOT NULL,
+    why TEXT NOT NULL,
+    helpful TEXT NOT NULL,
+    project TEXT NOT NULL,
+    source TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE
+);
+CREATE INDEX IF NOT EXISTS applications_by_category ON applications (category, id);
+"""
+
+# Columns stored for each kind of record, in insert order
+COLUMNS = {
+    "concepts": ("block", "topic", "content"),
+    "examples": ("title", "difficulty", "tags", "output_image", "code"),
+    "applications": ("title", "category", "difficulty", "use", "why", "helpful", "project"),
+}
+
+_local = threading.local()
+# One migrate() at a time, so the startup migration and a page's own don't race for the write lock
+_migrating = threading.Lock()
+
+
+def content_hash(record):
+    """
+    sha256 of a record's stored columns, so the same content is never stored
+    twice. A concept's block number is only its position, so it's left out.
+    """
+    content = {key: value for key, value in record.items() if key != "block"}
+    canonical = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _rehash_concepts(conn):
+    # Version 3 leaves the block number out of concept hashes. Concepts that
+    # only differed by position are duplicates now; the first one is kept.
+    seen = set()
+    updates, duplicates = [], []
+    for row in conn.execute("SELECT * FROM concepts ORDER BY id"):
+        digest = content_hash({column: row[column] for column in COLUMNS["concepts"]})
+        if digest in seen:
+            duplicates.append((row["id"],))
+        else:
+            seen.add(digest)
+            updates.append((digest, row["id"]))
+    conn.executemany("DELETE FROM concepts WHERE id = ?", duplicates)
+    conn.executemany("UPDATE concepts SET content_hash = ? WHERE id = ?", updates)
+    _touch(conn)
+
+
+def _move_applications_source(conn):
+    # Version 4 imports the cards from assets/applications.json. Hand the
+    # old rows to the new source so its first import replaces them, rather
+    # than leaving them behind under a name nothing imports any more.
+    new = os.path.relpath(APPLICATIONS_PATH, BASE_DIR).replace(os.sep, "/")
+    conn.execute("UPDATE applications SET source = ? WHERE source = ?", (new, LEGACY_APPLICATIONS_SOURCE))
+    conn.execute("DELETE FROM sources WHERE name = ?", (LEGACY_APPLICATIONS_SOURCE,))
+
+
+def _index_examples(conn):
+    # Version 5 adds examples_fts; index the examples already stored.
+    conn.execute("INSERT INTO examples_fts (examples_fts) VALUES ('rebuild')")
+
+
+# Data changes needed to bring an existing database up to each schema version
+UPGRADES = {
+    3: _rehash_concepts,
+    4: _move_applications_source,
+    5: _index_examples,
+}
+
+
+def _open(db_path):
+    conn = sqlite3.connect(db_path, cached_statements=STATEMENT_CACHE)
+    conn.row_factory = sqlite3.Row
+    # WAL lets the UI thread read while an import or migration writes.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != SCHEMA_VERSION:
+        with conn:
+            conn.executescript(SCHEMA)
+            # Identifies this database, so caches built from a deleted one are never mistaken for current
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('store_id', ?)", (uuid.uuid4().hex,))
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', 0)")
+            for step in range(version + 1, SCHEMA_VERSION + 1):
+                if version and step in UPGRADES:
+                    UPGRADES[step](conn)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    return conn
+
+
+def get_connection(db_path=DB_PATH):
+    """
+    This thread's connection to `db_path`, opened on first use and kept for
+    the life of the thread. Don't close it; call close_connections() when a
+    worker thread is done with the database.
+    """
+    db_path = os.path.abspath(db_path)
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = connections[db_path] = _open(db_path)
+    return conn
+
+
+def close_connections():
+    for conn in getattr(_local, "connections", {}).values():
+        conn.close()
+    _local.connections = {}
+
+
+def content_version(db_path=DB_PATH):
+    """
+    A string that changes whenever stored content does: caches built from
+    the store, like the content bundle, keep it to tell whether they are
+    current.
+    """
+    meta = dict(tuple(row) for row in get_connection(db_path).execute("SELECT key, value FROM meta"))
+    return f"{meta.get('store_id')}:{meta.get('revision', 0)}"
+
+
+def _touch(conn):
+    conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+
+
+def normalize(kind, item):
+    """The stored columns of one concept, example or application card, as a dict."""
+    if kind == "examples":
+        tags = item.get("tags") or []
+        return {
+            "title": item.get("title", "Untitled"),
+            "difficulty": item.get("difficulty") or "beginner",
+            "tags": " ".join(tags) if isinstance(tags, list) else str(tags),
+            "output_image": item.get("output_image"),
+            "code": item.get("code", ""),
+        }
+    if kind == "applications":
+        return {column: str(item.get(column, "")).strip() for column in COLUMNS["applications"]}
+    return {"block": item.get("block", 0), "topic": item["topic"], "content": item.get("content", "")}
+
+
+def insert_rows(conn, kind, items, source):
+    """
+    Insert normalized records of `kind`, skipping any whose content_hash is
+    already stored. Runs inside the caller's transaction. Returns the
+    number of rows inserted.
+    """
+    columns = COLUMNS[kind] + ("source", "content_hash")
+    sql = (f"INSERT OR IGNORE INTO {kind} ({', '.join(columns)}) "
+           f"VALUES ({', '.join('?' for _ in columns)})")
+    # rowcount, unlike total_changes, leaves out the rows the examples_fts triggers write
+    inserted = conn.executemany(sql, ([*(record[column] for column in COLUMNS[kind]), source, content_hash(record)]
+                                      for record in items)).rowcount
+    if inserted:
+        _touch(conn)
+    return inserted
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _flat_files():
+    def concepts():
+        with open(CONCEPTS_PATH, "r", encoding="utf-8") as f:
+            text = f.read()
+        return [normalize("concepts", {"block": block, "topic": title, "content": body})
+                for block, title, body in split_topics(text)]
+
+    def examples():
+        with open(EXAMPLES_PATH, "r", encoding="utf-8") as f:
+            return [normalize("examples", item) for item in json.load(f)]
+
+    def applications():
+        with open(APPLICATIONS_PATH, "r", encoding="utf-8") as f:
+            return [normalize("applications", item) for item in json.load(f)]
+
+    return [("concepts", CONCEPTS_PATH, concepts), ("examples", EXAMPLES_PATH, examples),
+            ("applications", APPLICATIONS_PATH, applications)]
+
+
+def migrate(db_path=DB_PATH):
+    """
+    Import the flat files (concepts_raw.txt, the examples JSON and the
+    application cards) into the store. A source whose size and mtime match
+    the last import is skipped; a changed one replaces exactly the rows it
+    imported before. Returns {table: rows inserted}.
+    """
+    conn = get_connection(db_path)
+    imported = {}
+    with _migrating:
+        for kind, path, load in _flat_files():
+            name = os.path.relpath(path, BASE_DIR).replace(os.sep, "/")
+            stamp = _stamp(path)
+            row = conn.execute("SELECT stamp FROM sources WHERE name = ?", (name,)).fetchone()
+            if row is not None and row["stamp"] == stamp:
+                continue
+            items = load()
+            with conn:
+                conn.execute(f"DELETE FROM {kind} WHERE source = ?", (name,))
+                _touch(conn)
+                imported[kind] = insert_rows(conn, kind, items, name)
+                conn.execute("INSERT OR REPLACE INTO sources (name, stamp) VALUES (?, ?)", (name, stamp))
+    return imported
+
+
+def flat_stamps():
+    """Size and mtime of each flat file, to tell whether migrate() has anything to do."""
+    return {kind: _stamp(path) if os.path.exists(path) else None for kind, path, _ in _flat_files()}
+
+
+def fetch_concepts(db_path=DB_PATH):
+    """Yield (block, topic, content) for every concept in import order, streaming from the cursor."""
+    for row in get_connection(db_path).execute("SELECT block, topic, content FROM concepts ORDER BY id"):
+        yield row["block"], row["topic"], row["content"]
+
+
+def fetch_examples(db_path=DB_PATH):
+    """Yield every example as an examples-JSON style dict (tags as a list), in import order."""
+    for row in get_connection(db_path).execute("SELECT * FROM examples ORDER BY id"):
+        item = {column: row[column] for column in COLUMNS["examples"]}
+        item["tags"] = item["tags"].split()
+        yield item
+
+
+def fetch_applications(db_path=DB_PATH):
+    """Yield every application card as a dict, in import order."""
+    for row in get_connection(db_path).execute("SELECT * FROM applications ORDER BY id"):
+        yield {column: row[column] for column in COLUMNS["applications"]}
+
+
+def _page(sql, params, after, limit, db_path):
+    return list(get_connection(db_path).execute(sql, (*params, after, limit)))
+
+
+def concept_page(after=0, limit=PAGE_SIZE, db_path=DB_PATH):
+    """
+    Up to `limit` concept headers (id, block, topic) after id `after`. Pass
+    the last id back as `after` for the next page; bodies come from concept().
+    """
+    return _page("SELECT id, block, topic FROM concepts WHERE id > ? ORDER BY id LIMIT ?", (), after, limit,
+                 db_path)
+
+
+def concept(concept_id, db_path=DB_PATH):
+    return get_connection(db_path).execute("SELECT * FROM concepts WHERE id = ?", (concept_id,)).fetchone()
+
+
+def example_page(after=0, limit=PAGE_SIZE, difficulty=None, db_path=DB_PATH):
+    """Up to `limit` example headers (no code) after id `after`, optionally of one difficulty."""
+    if difficulty is None:
+        return _page("SELECT id, title, difficulty, tags FROM examples WHERE id > ? ORDER BY id LIMIT ?",
+                     (), after, limit, db_path)
+    return _page("SELECT id, title, difficulty, tags FROM examples "
+                 "WHERE difficulty = ? AND id > ? ORDER BY id LIMIT ?", (difficulty,), after, limit, db_path)
+
+
+def example(example_id, db_path=DB_PATH):
+    return get_connection(db_path).execute("SELECT * FROM examples WHERE id = ?", (example_id,)).fetchone()
+
+
+def application_page(after=0, limit=PAGE_SIZE, category=None, db_path=DB_PATH):
+    if category is None:
+        return _page("SELECT * FROM applications WHERE id > ? ORDER BY id LIMIT ?", (), after, limit, db_path)
+    return _page("SELECT * FROM applications WHERE category = ? AND id > ? ORDER BY id LIMIT ?",
+                 (category,), after, limit, db_path)
+
+
+def iter_pages(page, limit=PAGE_SIZE, **filters):
+    """
+    Yield rows of any *_page accessor one page at a time, never holding
+    more than `limit`. Filters, and db_path, are passed through to `page`.
+    """
+    after = 0
+    while True:
+        rows = page(after=after, limit=limit, **filters)
+        yield from rows
+        if len(rows) < limit:
+            return
+        after = rows[-1]["id"]
+
+
+if __name__ == "__main__":
+    import time
+
+    started = time.perf_counter()
+    counts = migrate()
+    print(f"migrated {DB_PATH} in {(time.perf_counter() - started) * 1000:.1f} ms: "
+          + (", ".join(f"{count} {kind}" for kind, count in counts.items()) or "already up to date"))
 
-def get_connection(db_path="db/content.db"):
-    abs_path = os.path.abspath(db_path)
-    return sqlite3.connect(abs_path)
+    ids = [row["id"] for row in iter_pages(concept_page)]
+    lookups = 2000
 
+    def fresh_connection(concept_id):
+        # What every call used to do
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            return conn.execute("SELECT * FROM concepts WHERE id = ?", (concept_id,)).fetchone()
+        finally:
+            conn.close()
 
-def fetch_concepts():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT topic, content FROM concepts")
-    data = cursor.fetchall()
-    conn.close()
-    return data
\ No newline at end of file
+    for label, lookup in (("connection per call", fresh_connection), ("pooled connection", concept)):
+        started = time.perf_counter()
+        for i in range(lookups):
+            lookup(ids[i % len(ids)])
+        print(f"{label:20} {(time.perf_counter() - started) / lookups * 1e6:7.1f} us per lookup")
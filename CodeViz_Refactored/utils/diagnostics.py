@@ -0,0 +1,140 @@
+import json
+import re
+from utils.runner import Job
+from utils.toolchains import get_registry
+
+# Typing pause before a background syntax check starts, in milliseconds
+DEFAULT_DELAY_MS = 600
+POLL_MS = 50
+CHECK_TIMEOUT = 15
+
+_TEXT_RE = re.compile(r"^<stdin>:(\d+):(\d+): (fatal error|error|warning|note): (.*)$", re.MULTILINE)
+
+
+class Diagnostic:
+    """A compiler message. Lines are 1-based, columns 0-based character offsets."""
+
+    def __init__(self, line, column, end_column, severity, message):
+        self.line = line
+        self.column = column
+        self.end_column = end_column
+        self.severity = severity
+        self.message = message
+
+
+def _char_column(lines, line, byte_column):
+    # gcc reports 1-based byte columns; Tk indexes characters.
+    if not 1 <= line <= len(lines):
+        return 0
+    encoded = lines[line - 1].encode("utf-8")
+    return len(encoded[:max(0, byte_column - 1)].decode("utf-8", "ignore"))
+
+
+def parse_json(output, source):
+    lines = source.split("\n")
+    diagnostics = []
+    for item in json.loads(output or "[]"):
+        if not item.get("locations"):
+            continue
+        location = item["locations"][0]
+        caret = location["caret"]
+        line = caret["line"]
+        column = _char_column(lines, line, caret.get("byte-column", caret["column"]))
+        end_column = None
+        finish = location.get("finish")
+        if finish and finish["line"] == line:
+            end_column = _char_column(lines, line, finish.get("byte-column", finish["column"])) + 1
+        severity = "error" if "error" in item["kind"] else item["kind"]
+        diagnostics.append(Diagnostic(line, column, end_column, severity, item["message"]))
+    return diagnostics
+
+
+def parse_text(output, source):
+    lines = source.split("\n")
+    diagnostics = []
+    for match in _TEXT_RE.finditer(output):
+        line = int(match.group(1))
+        column = _char_column(lines, line, int(match.group(2)))
+        severity = "error" if "error" in match.group(3) else match.group(3)
+        diagnostics.append(Diagnostic(line, column, None, severity, match.group(4)))
+    return diagnostics
+
+
+class SyntaxChecker:
+    """
+    Runs `gcc -fsyntax-only` on the editor contents after a typing pause,
+    never blocking the UI thread and never running more than one check at a
+    time. Text that arrives while a check is running cancels it; only the
+    result for the latest text is handed to `on_result(diagnostics)`.
+    """
+
+    def __init__(self, widget, get_text, on_result, delay_ms=DEFAULT_DELAY_MS, compiler=None):
+        self.widget = widget
+        self.get_text = get_text
+        self.on_result = on_result
+        self.delay_ms = delay_ms
+        self.compiler = compiler
+        # None until the toolchain registry says whether gcc takes JSON diagnostics
+        self.json_format = None
+        self._after_id = None
+        self._job = None
+        self._pending = None
+
+    def schedule(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+        self._after_id = self.widget.after(self.delay_ms, self._request)
+
+    def _request(self):
+        self._after_id = None
+        self._pending = self.get_text()
+        if self._job is None:
+            self._start()
+        else:
+            # Stale: the text changed since this check started.
+            self._job.cancel()
+
+    def _start(self):
+        source, self._pending = self._pending, None
+        self._job = Job(lambda job: self._check(job, source), timeout=CHECK_TIMEOUT).start()
+        self.widget.after(POLL_MS, self._poll)
+
+    def _check(self, job, source):
+        gcc = get_registry().get("gcc")
+        compiler = self.compiler or gcc.path
+        if compiler is None:
+            return None
+        if self.json_format is None:
+            self.json_format = gcc.supports("-fdiagnostics-format=json") if compiler == gcc.path else True
+        while True:
+            fmt = ["-fdiagnostics-format=json"] if self.json_format else []
+            result = job.run_process([compiler, "-fsyntax-only", *fmt, "-x", "c", "-"], stdin=source)
+            if result.cancelled or result.timed_out:
+                return None
+            if self.json_format and "-fdiagnostics-format" in result.stderr:
+                # Compiler too old for JSON diagnostics; fall back to text.
+                self.json_format = False
+                continue
+            if self.json_format:
+                return parse_json(result.stderr, source)
+            return parse_text(result.stderr, source)
+
+    def _poll(self):
+        for kind, payload in self._job.poll():
+            if kind == "status":
+                continue
+            self._job = None
+            if self._pending is not None:
+                self._start()
+            elif kind == "done" and payload is not None:
+                self.on_result(payload)
+            return
+        self.widget.after(POLL_MS, self._poll)
+
+    def cancel(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        self._pending = None
+        if self._job is not None:
+            self._job.cancel()
@@ -0,0 +1,159 @@
+import re
+import sqlite3
+import threading
+from utils.db_utils import DB_PATH, close_connections, get_connection, migrate
+
+DIFFICULTIES = ["beginner", "intermediate", "advanced"]
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def fts_query(text):
+    """
+    FTS5 MATCH expression for what the user typed: every word must match,
+    the last one as a prefix so results narrow while typing. Quoting each
+    word keeps FTS syntax characters in C code (*, -, ") from erroring.
+    """
+    words = _WORD_RE.findall(text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*']
+    return " ".join(terms)
+
+
+class ExampleStore:
+    """
+    Search over the examples in the content store (see utils.db_utils),
+    which keeps a full-text index of their titles, code and tags. On a
+    background thread the store is first brought up to date with the
+    examples JSON; queries wait for that. Listings carry only id, title,
+    difficulty and tags; code() fetches a body when an example is actually
+    opened.
+    """
+
+    def __init__(self, content_db=DB_PATH):
+        self.content_db = content_db
+        self.error = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._build, daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        self.start()
+        self._ready.wait(timeout)
+        return self
+
+    def _build(self):
+        try:
+            migrate(self.content_db)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            self.error = e
+        finally:
+            close_connections()
+        self._ready.set()
+
+    def _query(self, sql, params=()):
+        self.wait()
+        if self.error is not None:
+            return []
+        return get_connection(self.content_db).execute(sql, params).fetchall()
+
+    def search(self, text="", tag=None, difficulty=None):
+        """
+        (id, title, difficulty, tags) of matching examples: best match first
+        when searching, file order otherwise. Code is not included.
+        """
+        where, params = [], []
+        if tag:
+            where.append("(' ' || e.tags || ' ') LIKE ?")
+            params.append(f"% {tag} %")
+        if difficulty:
+            where.append("e.difficulty = ?")
+            params.append(difficulty)
+        match = fts_query(text)
+        if match:
+            # Title hits weigh more than code hits
+            sql = ("SELECT e.id, e.title, e.difficulty, e.tags FROM examples_fts "
+                   "JOIN examples e ON e.id = examples_fts.rowid WHERE examples_fts MATCH ?")
+            params.insert(0, match)
+            order = " ORDER BY bm25(examples_fts, 10.0, 1.0, 5.0), e.id"
+        else:
+            sql = "SELECT e.id, e.title, e.difficulty, e.tags FROM examples e WHERE 1"
+            order = " ORDER BY e.id"
+        sql += "".join(f" AND {clause}" for clause in where) + order
+        try:
+            rows = self._query(sql, params)
+        except sqlite3.OperationalError:
+            return []
+        return [(row[0], row[1], row[2], row[3].split()) for row in rows]
+
+    def code(self, example_id):
+        rows = self._query("SELECT code FROM examples WHERE id = ?", (example_id,))
+        return rows[0][0] if rows else ""
+
+    def output_image(self, example_id):
+        rows = self._query("SELECT output_image FROM examples WHERE id = ?", (example_id,))
+        return rows[0][0] if rows else None
+
+    def tags(self):
+        tags = set()
+        for (value,) in self._query("SELECT DISTINCT tags FROM examples"):
+            tags.update(value.split())
+        return sorted(tags)
+
+    def count(self):
+        rows = self._query("SELECT COUNT(*) FROM examples")
+        return rows[0][0] if rows else 0
+
+
+if __name__ == "__main__":
+    import json
+    import os
+    import random
+    import tempfile
+    import time
+    from utils.db_utils import EXAMPLES_PATH, get_connection, insert_rows, normalize
+
+    with open(EXAMPLES_PATH, "r", encoding="utf-8") as f:
+        examples = json.load(f)
+
+    with tempfile.TemporaryDirectory() as folder:
+        for copies in (1, 250):
+            # Scale the shipped examples up to see how the library behaves with thousands; distinct
+            # titles, so the store doesn't fold them into the shipped ones
+            scaled = []
+            for i in range(copies):
+                for example in examples:
+                    scaled.append(dict(example, title=f"{example['title']} #{i}"))
+            content_db = os.path.join(folder, f"content_{copies}.db")
+            # Timed below is storing and indexing the examples, not the one-off import of the flat files
+            migrate(content_db)
+
+            started = time.perf_counter()
+            with get_connection(content_db) as conn:
+                insert_rows(conn, "examples", [normalize("examples", item) for item in scaled], "benchmark")
+            indexed = time.perf_counter() - started
+            started = time.perf_counter()
+            store = ExampleStore(content_db).wait()
+            opened = time.perf_counter() - started
+
+            queries = ["", "pal", "prime", "printf", "strlen rev", "while"]
+            started = time.perf_counter()
+            for _ in range(20):
+                store.search(random.choice(queries))
+            per_search = (time.perf_counter() - started) / 20
+            started = time.perf_counter()
+            store.code(len(scaled) // 2)
+            fetch = time.perf_counter() - started
+            print(f"{len(scaled):5} examples: store + index {indexed * 1000:7.1f} ms, open {opened * 1000:5.1f} ms, "
+                  f"search {per_search * 1000:5.2f} ms, code fetch {fetch * 1000:5.2f} ms")
+        close_connections()
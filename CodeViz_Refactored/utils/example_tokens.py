@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import threading
+from pygments.lexers import CLexer
+from utils.paths import user_cache_dir
+
+CACHE_VERSION = 1
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def tokenize(code):
+    """
+    Token ranges of C `code` grouped by Pygments token type, as a flat
+    [line, col, end_line, end_col, ...] list per type, ready to become Tk
+    indices. Offsets are exact: the lexer neither strips nor adds newlines.
+    """
+    lexer = CLexer(stripnl=False, ensurenl=False)
+    spans = {}
+    line, col = 1, 0
+    for _, token_type, value in lexer.get_tokens_unprocessed(code):
+        newlines = value.count("\n")
+        if newlines:
+            end_line, end_col = line + newlines, len(value) - value.rfind("\n") - 1
+        else:
+            end_line, end_col = line, col + len(value)
+        if value.strip():
+            spans.setdefault(str(token_type), []).extend((line, col, end_line, end_col))
+        line, col = end_line, end_col
+    return spans
+
+
+def tag_ranges(spans):
+    """Turn tokenize() output into {tag: [index, index, ...]} for a single tag_add(tag, *indices) each."""
+    ranges = {}
+    for tag, flat in spans.items():
+        indices = []
+        for i in range(0, len(flat), 4):
+            indices.append(f"{flat[i]}.{flat[i + 1]}")
+            indices.append(f"{flat[i + 2]}.{flat[i + 3]}")
+        ranges[tag] = indices
+    return ranges
+
+
+class ExampleTokenCache:
+    """
+    Token ranges for every example in a JSON examples file, computed once on
+    a background thread and kept in a cache file. The file is reused while
+    the JSON's mtime is unchanged, or its hash if the mtime moved. Lookups
+    are by code hash, so an example that was edited is simply lexed on
+    demand.
+    """
+
+    def __init__(self, json_path, cache_path=None):
+        self.json_path = json_path
+        self.cache_path = cache_path or os.path.join(user_cache_dir(), "example_tokens.json")
+        self._spans = {}
+        self._ranges = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._build, daemon=True)
+            self._thread.start()
+        return self
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cached if cached.get("version") == CACHE_VERSION else None
+
+    def _build(self):
+        try:
+            mtime = os.path.getmtime(self.json_path)
+            cached = self._load()
+            if cached and cached["mtime"] == mtime:
+                spans = cached["spans"]
+            else:
+                with open(self.json_path, "rb") as f:
+                    raw = f.read()
+                digest = hashlib.sha256(raw).hexdigest()
+                if cached and cached["sha256"] == digest:
+                    spans = cached["spans"]
+                else:
+                    examples = json.loads(raw.decode("utf-8"))
+                    spans = {_digest(ex.get("code", "")): tokenize(ex.get("code", "")) for ex in examples}
+                self._save({"version": CACHE_VERSION, "mtime": mtime, "sha256": digest, "spans": spans})
+        except (OSError, ValueError, KeyError, AttributeError):
+            return
+        with self._lock:
+            for key, value in spans.items():
+                self._spans.setdefault(key, value)
+
+    def _save(self, cached):
+        staging = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(staging, "w", encoding="utf-8") as f:
+                json.dump(cached, f, separators=(",", ":"))
+            os.replace(staging, self.cache_path)
+        except OSError:
+            pass
+
+    def ranges(self, code):
+        """{tag: indices} for `code`, memoized; lexes now if the background pass hasn't got to it."""
+        key = _digest(code)
+        ranges = self._ranges.get(key)
+        if ranges is None:
+            with self._lock:
+                spans = self._spans.get(key)
+            if spans is None:
+                spans = tokenize(code)
+                with self._lock:
+                    self._spans[key] = spans
+            ranges = self._ranges[key] = tag_ranges(spans)
+        return ranges
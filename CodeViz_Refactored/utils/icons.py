@@ -0,0 +1,117 @@
+import os
+import re
+from PyQt5.QtCore import QSize, Qt
+from PyQt5.QtGui import QColor, QIcon, QPainter, QPixmap
+from utils.paths import user_cache_dir
+
+ICON_SIZE = 24
+
+_tinted = {}
+
+
+def tint_pixmap(pixmap, color):
+    """Recolour every painted pixel of `pixmap` to `color`, keeping its alpha (anti-aliased edges)."""
+    result = QPixmap(pixmap.size())
+    result.setDevicePixelRatio(pixmap.devicePixelRatio())
+    result.fill(Qt.transparent)
+    painter = QPainter(result)
+    painter.drawPixmap(0, 0, pixmap)
+    # SourceIn keeps the destination's alpha and takes the colour from the fill
+    painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+    painter.fillRect(result.rect(), QColor(color))
+    painter.end()
+    return result
+
+
+def _cache_path(name, color, size):
+    theme = QIcon.themeName() or "default"
+    stem = re.sub(r"[^\w.-]", "_", f"{theme}-{name}-{color.lstrip('#')}-{size}")
+    return os.path.join(user_cache_dir("icons"), stem + ".png")
+
+
+def tinted_icon(name, color, size=ICON_SIZE):
+    """
+    Theme icon `name` tinted to `color`, memoized per (name, color, size)
+    in memory and as a PNG in the user cache dir, so only the very first
+    editor ever paints it.
+    """
+    key = (name, color, size)
+    if key in _tinted:
+        return _tinted[key]
+    path = _cache_path(name, color, size)
+    pixmap = QPixmap()
+    if not pixmap.load(path):
+        source = QIcon.fromTheme(name).pixmap(QSize(size, size))
+        if source.isNull():
+            # No such icon in this theme; the toolbar falls back to the action text.
+            _tinted[key] = QIcon()
+            return _tinted[key]
+        pixmap = tint_pixmap(source, color)
+        pixmap.save(path, "PNG")
+    _tinted[key] = QIcon(pixmap)
+    return _tinted[key]
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import shutil
+    import statistics
+    import sys
+    import time
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtGui import QImage
+    from PyQt5.QtWidgets import QApplication
+    from pages.compiler import CodeEditor
+
+    app = QApplication(sys.argv)
+    colors = ["#56B6C2", "#E5C07B", "#61AFEF", "#98C379", "#E06C75"]
+
+    def per_pixel(pixmap, color):
+        # The loop CodeEditor used before, kept here as the baseline
+        image = pixmap.toImage()
+        for x in range(image.width()):
+            for y in range(image.height()):
+                if image.pixelColor(x, y).alpha() > 0:
+                    image.setPixelColor(x, y, QColor(color))
+        return QPixmap.fromImage(image)
+
+    def sample_icon(size):
+        # Stand-in for a theme icon, since themes differ between machines
+        image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setBrush(QColor("black"))
+        painter.drawEllipse(2, 2, size - 4, size - 4)
+        painter.end()
+        return QPixmap.fromImage(image)
+
+    def median_ms(fn, runs=20):
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - started)
+        return statistics.median(samples) * 1000
+
+    for size in (24, 48):
+        icon = sample_icon(size)
+        old = median_ms(lambda: [per_pixel(icon, color) for color in colors])
+        new = median_ms(lambda: [tint_pixmap(icon, color) for color in colors])
+        print(f"tint 5 icons at {size}px: per-pixel {old:7.2f} ms, SourceIn {new:6.2f} ms")
+
+    def construct():
+        with contextlib.redirect_stdout(io.StringIO()):
+            editor = CodeEditor()
+            editor.close()
+            editor.deleteLater()
+            app.processEvents()
+
+    shutil.rmtree(user_cache_dir("icons"), ignore_errors=True)
+    started = time.perf_counter()
+    construct()
+    print(f"editor construction, empty icon cache: {(time.perf_counter() - started) * 1000:7.1f} ms")
+    print(f"editor construction, cached icons:     {median_ms(construct, runs=10):7.1f} ms (median of 10)")
+    print(f"icon theme: {QIcon.themeName() or 'none'}")
@@ -0,0 +1,257 @@
+import argparse
+import codecs
+import json
+import os
+import re
+import sys
+import time
+from utils.db_utils import DB_PATH, get_connection, insert_rows, normalize
+
+# Rows written per transaction
+DEFAULT_BATCH = 5000
+# Bytes read from a pack at a time
+CHUNK_BYTES = 256 * 1024
+# Invalid entries listed individually before the rest are only counted
+MAX_REPORTED = 10
+
+_SEPARATOR_RE = re.compile(r"-{10,}")
+
+PROGRESS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS import_progress (
+    pack TEXT PRIMARY KEY,
+    stamp TEXT NOT NULL,
+    byte_offset INTEGER NOT NULL,
+    entries INTEGER NOT NULL,
+    inserted INTEGER NOT NULL,
+    done INTEGER NOT NULL
+);
+"""
+
+
+def iter_json_pack(path, offset=0):
+    """
+    Yield (entry, byte offset just past it) for each element of a JSON
+    array, reading CHUNK_BYTES at a time and decoding one element at a time
+    with raw_decode. `offset` must be 0 or an offset this generator yielded.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as f:
+        f.seek(offset)
+        buffer = ""
+        position = offset
+        eof = False
+        while True:
+            # Whitespace, commas, the opening bracket and a byte order mark
+            skipped = len(buffer) - len(buffer.lstrip(" \t\r\n,[\ufeff"))
+            if skipped:
+                position += len(buffer[:skipped].encode("utf-8"))
+                buffer = buffer[skipped:]
+            if buffer.startswith("]"):
+                return
+            if buffer:
+                try:
+                    entry, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise ValueError(f"{path}: malformed JSON at byte {position}")
+                else:
+                    position += len(buffer[:end].encode("utf-8"))
+                    buffer = buffer[end:]
+                    yield entry, position
+                    continue
+            if eof:
+                return
+            data = f.read(CHUNK_BYTES)
+            eof = not data
+            buffer += utf8.decode(data, final=eof)
+
+
+def iter_text_pack(path, offset=0):
+    """
+    Yield ({"topic", "content"}, byte offset just past it) for each block
+    of a concepts text pack, in the concepts_raw.txt format: blocks
+    separated by a line of dashes, the first line of each being its topic.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        position = offset
+        lines = []
+        while True:
+            raw = f.readline()
+            position += len(raw)
+            line = raw.decode("utf-8", errors="replace")
+            if raw and not _SEPARATOR_RE.search(line):
+                lines.append(line)
+                continue
+            text = "".join(lines).strip()
+            lines = []
+            if text:
+                topic, _, content = text.partition("\n")
+                yield {"topic": topic.strip(), "content": content.strip()}, position
+            if not raw:
+                return
+
+
+def entry_kind(entry, default=None):
+    """Which table an entry belongs in, from its keys unless --kind forces one."""
+    if default:
+        return default
+    if "code" in entry:
+        return "examples"
+    if "category" in entry or "project" in entry:
+        return "applications"
+    if "topic" in entry or "content" in entry:
+        return "concepts"
+    return None
+
+
+def validate(kind, entry):
+    """None if `entry` can be stored as a `kind`, else why not."""
+    if not isinstance(entry, dict):
+        return f"expected an object, got {type(entry).__name__}"
+    required = {
+        "concepts": ("topic",),
+        "examples": ("title", "code"),
+        "applications": ("title", "category", "use"),
+    }.get(kind)
+    if required is None:
+        return "can't tell whether this is a concept, example or application"
+    for key in required:
+        value = entry.get(key)
+        if not isinstance(value, str) or not value.strip():
+            return f"missing {key!r}"
+    if kind == "examples" and not isinstance(entry.get("tags", []), (list, str)):
+        return "'tags' must be a list"
+    return None
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class PackImporter:
+    """
+    Streams one pack into the content database. Entries are validated,
+    normalized and written in transactions of `batch` rows; duplicates of
+    anything already stored are dropped by content_hash. Each transaction
+    also records how far into the file it got, so an interrupted import
+    resumes from the last committed batch.
+    """
+
+    def __init__(self, path, db_path=DB_PATH, batch=DEFAULT_BATCH, kind=None, restart=False, report=print):
+        self.path = os.path.abspath(path)
+        self.db_path = db_path
+        self.batch = batch
+        self.kind = kind
+        self.restart = restart
+        self.report = report
+        self.source = "pack:" + os.path.basename(path)
+        self.entries = 0
+        self.inserted = 0
+        self.invalid = 0
+
+    def _entries(self, offset):
+        if self.path.lower().endswith(".json"):
+            return iter_json_pack(self.path, offset)
+        return iter_text_pack(self.path, offset)
+
+    def _resume(self, conn, stamp):
+        row = conn.execute("SELECT * FROM import_progress WHERE pack = ?", (self.path,)).fetchone()
+        if row is None or row["stamp"] != stamp or self.restart:
+            return None
+        return row
+
+    def _commit(self, conn, pending, stamp, offset, done=False):
+        with conn:
+            for kind, rows in pending.items():
+                if rows:
+                    self.inserted += insert_rows(conn, kind, rows, self.source)
+            conn.execute("INSERT OR REPLACE INTO import_progress "
+                         "(pack, stamp, byte_offset, entries, inserted, done) VALUES (?, ?, ?, ?, ?, ?)",
+                         (self.path, stamp, offset, self.entries, self.inserted, int(done)))
+        for rows in pending.values():
+            rows.clear()
+
+    def run(self):
+        """Import the pack; returns rows inserted by this run."""
+        conn = get_connection(self.db_path)
+        conn.executescript(PROGRESS_SCHEMA)
+        stamp = _stamp(self.path)
+        progress = self._resume(conn, stamp)
+        offset = 0
+        if progress is not None:
+            if progress["done"]:
+                self.report(f"{self.path}: already imported ({progress['inserted']} rows); use --restart to re-read")
+                return 0
+            offset = progress["byte_offset"]
+            self.entries, self.inserted = progress["entries"], progress["inserted"]
+            self.report(f"{self.path}: resuming after {self.entries} entries (byte {offset})")
+        resumed_entries, resumed_inserted = self.entries, self.inserted
+
+        pending = {"concepts": [], "examples": [], "applications": []}
+        queued = 0
+        started = time.perf_counter()
+        for entry, end in self._entries(offset):
+            self.entries += 1
+            kind = entry_kind(entry, self.kind) if isinstance(entry, dict) else None
+            problem = validate(kind, entry)
+            if problem is not None:
+                self.invalid += 1
+                if self.invalid <= MAX_REPORTED:
+                    self.report(f"  entry {self.entries}: skipped, {problem}")
+            else:
+                if kind == "concepts":
+                    entry = dict(entry, block=self.entries)
+                pending[kind].append(normalize(kind, entry))
+                queued += 1
+            if queued >= self.batch:
+                self._commit(conn, pending, stamp, end)
+                queued = 0
+                elapsed = time.perf_counter() - started
+                self.report(f"  {self.entries} entries read, {self.inserted} rows stored, "
+                            f"{(self.inserted - resumed_inserted) / elapsed:,.0f} rows/s")
+            offset = end
+        self._commit(conn, pending, stamp, offset, done=True)
+
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        added = self.inserted - resumed_inserted
+        duplicates = self.entries - resumed_entries - self.invalid - added
+        self.report(f"{self.path}: {added} rows in {elapsed:.2f} s ({added / elapsed:,.0f} rows/s); "
+                    f"{duplicates} duplicate{'s' if duplicates != 1 else ''}, {self.invalid} invalid")
+        return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.import_pack",
+        description="Import JSON or text content packs into the content database, resuming interrupted imports.",
+        epilog="Imported concepts, examples and application cards appear on the Concepts, Learning Module "
+               "and Applications pages the next time the app starts.")
+    parser.add_argument("packs", nargs="+", help=".json packs (an array of entries) or concepts text packs")
+    parser.add_argument("--db", default=DB_PATH, help="content database (default: db/content.db)")
+    parser.add_argument("--kind", choices=["concepts", "examples", "applications"],
+                        help="treat every entry as this kind instead of inferring it from its keys")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH, help="rows per transaction")
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress and re-read packs from the start")
+    args = parser.parse_args(argv)
+
+    added = 0
+    for pack in args.packs:
+        importer = PackImporter(pack, db_path=args.db, batch=args.batch, kind=args.kind, restart=args.restart)
+        try:
+            added += importer.run()
+        except KeyboardInterrupt:
+            print(f"\n{pack}: interrupted; run the same command again to resume from the last committed batch")
+            return 130
+        except (OSError, ValueError) as e:
+            print(f"{pack}: {e}", file=sys.stderr)
+            return 1
+    if added:
+        print("Restart CodeViz to see the new content on the Concepts, Learning Module and Applications pages.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
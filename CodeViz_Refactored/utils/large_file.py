@@ -0,0 +1,87 @@
+import codecs
+import os
+
+# Files larger than this open in large-file mode
+LARGE_FILE_BYTES = 1024 * 1024
+# Bytes read (and inserted into the editor) at a time in large-file mode
+CHUNK_BYTES = 256 * 1024
+
+
+def iter_chunks(path, chunk_bytes=CHUNK_BYTES):
+    """
+    Yield (text, bytes_read) for a file in chunks, decoding UTF-8 and
+    normalising line endings the way open() in text mode would. A chunk
+    never ends inside a multi-byte character or between "\\r" and "\\n".
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    carry = ""
+    done = 0
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_bytes)
+            done += len(data)
+            text = carry + decoder.decode(data, final=not data)
+            carry = ""
+            if data and text.endswith("\r"):
+                text, carry = text[:-1], "\r"
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+            if text:
+                yield text, done
+            if not data:
+                return
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from PyQt5.QtWidgets import QApplication
+    from pages import compiler
+    from pages.compiler import CodeEditor
+
+    def rss():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def generate(path, size):
+        line = "int value_{0} = {0} * 2; /* generated line {0} */\n"
+        with open(path, "w") as f:
+            written, i = 0, 0
+            while written < size:
+                text = line.format(i)
+                f.write(text)
+                written += len(text)
+                i += 1
+
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as folder:
+        for megabytes in (1, 10, 50):
+            path = os.path.join(folder, f"generated_{megabytes}mb.c")
+            generate(path, megabytes * 1024 * 1024)
+            # The old path (one setPlainText, highlighting on) is too slow to be worth timing at 50 MB
+            thresholds = [LARGE_FILE_BYTES] + ([float("inf")] if megabytes <= 10 else [])
+            for threshold in thresholds:
+                compiler.LARGE_FILE_BYTES = threshold
+                editor = CodeEditor()
+                app.processEvents()
+                before = rss()
+                started = time.perf_counter()
+                editor.load_file(path)
+                while editor.load_job is not None or editor.pending_chunks:
+                    app.processEvents()
+                    time.sleep(0.001)
+                app.processEvents()
+                elapsed = time.perf_counter() - started
+                print(f"{megabytes:3} MB {'large-file mode' if editor.large_file_mode else 'old path':15}: "
+                      f"opened in {elapsed:6.2f} s, {editor.editor.document().blockCount():8} lines, "
+                      f"+{(rss() - before) / (1024 * 1024):6.1f} MB RSS")
+                editor.close()
+                editor.deleteLater()
+                app.processEvents()
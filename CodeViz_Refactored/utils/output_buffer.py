@@ -0,0 +1,84 @@
+import threading
+from collections import deque
+
+# Lines of program output kept for display; older lines are dropped
+DEFAULT_MAX_LINES = 2000
+# A "line" without a newline is hard-wrapped at this many characters
+MAX_LINE_CHARS = 4000
+# New text waiting for the UI beyond this triggers a full redraw instead
+MAX_PENDING_CHARS = 256 * 1024
+
+
+def format_size(num_bytes):
+    if num_bytes >= 1024 * 1024:
+        return f"{num_bytes / (1024 * 1024):.1f} MB"
+    if num_bytes >= 1024:
+        return f"{num_bytes / 1024:.1f} KB"
+    return f"{num_bytes} B"
+
+
+class OutputBuffer:
+    """
+    Thread-safe ring buffer of the last `max_lines` lines of program output.
+
+    Reader threads write() into it as data arrives; the UI calls take() at
+    its own pace. take() returns (True, full_text) when the widget must be
+    redrawn because old lines were dropped, otherwise (False, new_text) to
+    append, so memory and render cost stay bounded however much is printed.
+    """
+
+    def __init__(self, max_lines=DEFAULT_MAX_LINES):
+        self.max_lines = max_lines
+        self.total_chars = 0
+        self.dropped_bytes = 0
+        self._lines = deque()
+        self._partial = ""
+        self._pending = []
+        self._pending_chars = 0
+        self._redraw = False
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        if not text:
+            return
+        with self._lock:
+            self.total_chars += len(text)
+            *complete, self._partial = (self._partial + text).split("\n")
+            for line in complete:
+                self._lines.append(line + "\n")
+            while len(self._partial) > MAX_LINE_CHARS:
+                self._lines.append(self._partial[:MAX_LINE_CHARS] + "\n")
+                self._partial = self._partial[MAX_LINE_CHARS:]
+            while len(self._lines) > self.max_lines:
+                self.dropped_bytes += len(self._lines.popleft().encode("utf-8", "replace"))
+                self._redraw = True
+
+            if self._redraw or self._pending_chars + len(text) > MAX_PENDING_CHARS:
+                self._redraw = True
+                self._pending.clear()
+                self._pending_chars = 0
+            else:
+                self._pending.append(text)
+                self._pending_chars += len(text)
+
+    def take(self):
+        with self._lock:
+            if self._redraw:
+                self._redraw = False
+                self._pending.clear()
+                self._pending_chars = 0
+                return True, self._text()
+            text = "".join(self._pending)
+            self._pending.clear()
+            self._pending_chars = 0
+            return False, text
+
+    def text(self):
+        with self._lock:
+            return self._text()
+
+    def _text(self):
+        body = "".join(self._lines) + self._partial
+        if self.dropped_bytes:
+            return f"[... truncated {format_size(self.dropped_bytes)} ...]\n" + body
+        return body
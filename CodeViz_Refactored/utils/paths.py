@@ -0,0 +1,17 @@
+import os
+import sys
+
+
+def user_cache_dir(*parts):
+    """Return (and create) a per-user cache directory for CodeViz."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        root = os.path.join(base, "CodeViz", "Cache")
+    elif sys.platform == "darwin":
+        root = os.path.join(os.path.expanduser("~"), "Library", "Caches", "CodeViz")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        root = os.path.join(base, "codeviz")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
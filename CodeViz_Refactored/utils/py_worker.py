@@ -0,0 +1,220 @@
+"""
+Long-lived Python worker for utils.warm_pool.
+
+Started once with the target interpreter and kept warm. Every RUN request
+forks a fresh child from this already-initialised process, so snippets
+skip interpreter startup but can't affect each other or the worker. The
+child gets the caller's CPU, memory and file size limits as rlimits, and
+its output is streamed back as it is written, up to the output limit.
+
+Protocol (binary, over stdin/stdout), one request at a time:
+    request:  b"<op> <timeout> <name> <cpu_seconds> <memory_bytes> <output_bytes> <len_cwd> <len_source>\\n"
+              + cwd + source                                (limits are -1 for none)
+    response: any number of b"OUT <len>\\n" + data or b"ERR <len>\\n" + data, then
+              b"DONE <returncode> <timed_out> <output_limited> <utime> <stime> <maxrss>\\n"
+op is RUN or COMPILE. SIGUSR1 kills the running snippet.
+
+This file runs on its own under whichever interpreter is configured, so it
+must not import anything from the app.
+"""
+import linecache
+import os
+import select
+import signal
+import sys
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Modules students commonly import, loaded once so children inherit them
+PRELOAD = ("math", "random", "collections", "itertools", "functools", "re", "json", "string",
+           "heapq", "bisect", "datetime", "statistics", "fractions", "decimal")
+# Bytes read from the child's pipes at a time
+CHUNK_SIZE = 64 * 1024
+# How long to keep reading output a killed snippet's leftover processes may hold open
+DRAIN_SECONDS = 0.5
+
+_child = None
+
+
+def _stop_child(signum=None, frame=None):
+    if _child is not None:
+        try:
+            os.killpg(_child, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def _apply_limits(cpu_seconds, memory_bytes, output_bytes):
+    if resource is None:
+        return
+    if cpu_seconds >= 0:
+        seconds = max(1, int(cpu_seconds))
+        resource.setrlimit(resource.RLIMIT_CPU, (seconds, seconds + 1))
+    if memory_bytes >= 0:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    if output_bytes >= 0:
+        # Files the snippet writes itself; its stdout and stderr are capped by the worker
+        resource.setrlimit(resource.RLIMIT_FSIZE, (output_bytes, output_bytes))
+
+
+def _run_child(cwd, source, limits, out, err):
+    status = 1
+    try:
+        os.setsid()
+        if cwd:
+            os.chdir(cwd)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(out, 1)
+        os.dup2(err, 2)
+        sys.stdin = open(os.devnull, "r")
+        sys.stdout = open(1, "w", encoding="utf-8", errors="replace", closefd=False)
+        sys.stderr = open(2, "w", encoding="utf-8", errors="replace", closefd=False)
+        sys.argv = ["main.py"]
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+        _apply_limits(*limits)
+        # Let tracebacks show the snippet's source lines
+        linecache.cache["main.py"] = (len(source), None, source.splitlines(True), "main.py")
+        code = compile(source, "main.py", "exec")
+        exec(code, {"__name__": "__main__", "__builtins__": __builtins__})
+        status = 0
+    except SystemExit as e:
+        if e.code is None:
+            status = 0
+        elif isinstance(e.code, int):
+            status = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            status = 1
+    except BaseException as e:
+        # Skip this function's frame so the traceback starts in main.py
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(status)
+
+
+def _frame(responses, tag, data):
+    responses.write(b"%s %d\n" % (tag, len(data)))
+    responses.write(data)
+    responses.flush()
+
+
+def run(cwd, source, timeout, limits, responses):
+    """
+    Run `source` in a forked child, streaming its output to `responses` as
+    OUT/ERR frames. Returns (returncode, timed_out, output_limited, utime,
+    stime, maxrss), with maxrss always -1.
+    """
+    global _child
+    output_bytes = limits[2]
+    out_read, out_write = os.pipe()
+    err_read, err_write = os.pipe()
+    sys.stdout.flush()
+    pid = os.fork()
+    if pid == 0:
+        os.close(out_read)
+        os.close(err_read)
+        _run_child(cwd, source, limits, out_write, err_write)
+    _child = pid
+    os.close(out_write)
+    os.close(err_write)
+
+    tags = {out_read: b"OUT", err_read: b"ERR"}
+    deadline = time.monotonic() + timeout if timeout > 0 else None
+    timed_out = output_limited = False
+    written = 0
+    status = usage = None
+    drain_until = None
+    while tags:
+        now = time.monotonic()
+        if status is None and not timed_out and deadline is not None and now > deadline:
+            timed_out = True
+            _stop_child()
+        if drain_until is not None and now > drain_until:
+            break
+        ready, _, _ = select.select(list(tags), [], [], 0.05)
+        for fd in ready:
+            data = os.read(fd, CHUNK_SIZE)
+            if not data:
+                os.close(fd)
+                del tags[fd]
+                continue
+            if output_limited:
+                continue
+            if output_bytes >= 0 and written + len(data) > output_bytes:
+                output_limited = True
+                _stop_child()
+                continue
+            written += len(data)
+            _frame(responses, tags[fd], data)
+        if status is None:
+            done, status, usage = os.wait4(pid, os.WNOHANG)
+            if done:
+                # Anything the snippet started in the background goes with it
+                _stop_child()
+                drain_until = time.monotonic() + DRAIN_SECONDS
+            else:
+                status = None
+    for fd in tags:
+        os.close(fd)
+    if status is None:
+        _, status, usage = os.wait4(pid, 0)
+    _child = None
+
+    # No peak RSS (-1): the child is a fork that never execs, so its memory
+    # counts every page it inherited from this worker and there is no
+    # figure for the snippet alone.
+    return os.waitstatus_to_exitcode(status), timed_out, output_limited, usage.ru_utime, usage.ru_stime, -1
+
+
+def check(source):
+    try:
+        compile(source, "main.py", "exec")
+    except SyntaxError:
+        return 1, traceback.format_exc(limit=0).encode("utf-8")
+    return 0, b""
+
+
+def main():
+    for name in PRELOAD:
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+    signal.signal(signal.SIGUSR1, _stop_child)
+
+    requests = sys.stdin.buffer
+    responses = sys.stdout.buffer
+    while True:
+        header = requests.readline()
+        if not header:
+            return
+        op, timeout, _name, cpu_seconds, memory_bytes, output_bytes, cwd_len, source_len = header.split()
+        cwd = requests.read(int(cwd_len)).decode("utf-8")
+        source = requests.read(int(source_len)).decode("utf-8")
+
+        if op == b"COMPILE":
+            returncode, err = check(source)
+            if err:
+                _frame(responses, b"ERR", err)
+            result = (returncode, False, False, 0.0, 0.0, -1)
+        else:
+            limits = (float(cpu_seconds), int(memory_bytes), int(output_bytes))
+            result = run(cwd, source, float(timeout), limits, responses)
+
+        returncode, timed_out, output_limited, utime, stime, maxrss = result
+        responses.write(f"DONE {returncode} {int(timed_out)} {int(output_limited)} {utime} {stime} {maxrss}\n".encode())
+        responses.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from utils.runner import Job, DEFAULT_TIMEOUT
+
+
+class JobSignals(QObject):
+    progress = pyqtSignal(str)
+    output = pyqtSignal(str)
+    error_output = pyqtSignal(str)
+    finished = pyqtSignal(object)
+    cancelled = pyqtSignal(object)
+    error = pyqtSignal(object)
+    event = pyqtSignal(str, object)
+
+
+class _SignalSink:
+    def __init__(self, signal):
+        self.signal = signal
+
+    def write(self, text):
+        if text:
+            self.signal.emit(text)
+
+
+class _Runnable(QRunnable):
+    def __init__(self, work):
+        super().__init__()
+        self.work = work
+
+    def run(self):
+        self.work()
+
+
+class QtJob(Job):
+    """
+    A runner.Job run on the global QThreadPool that reports through Qt
+    signals instead of poll(). Create it on the GUI thread so its signals are
+    delivered there:
+
+        progress(text)        job.status() from the target
+        output(text)          stdout chunks written to job.stdout
+        error_output(text)    stderr chunks written to job.stderr
+        finished(value)       target returned
+        cancelled(value)      target returned after cancel()
+        error(exception)      target raised
+        event(kind, payload)  any other job.emit() from the target
+
+    Pass job.stdout / job.stderr as run_process(output=..., error_output=...)
+    to stream a program's output as it arrives.
+    """
+
+    def __init__(self, target, timeout=DEFAULT_TIMEOUT):
+        super().__init__(target, timeout)
+        self.signals = JobSignals()
+        self.stdout = _SignalSink(self.signals.output)
+        self.stderr = _SignalSink(self.signals.error_output)
+        self._running = False
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        self._running = True
+        QThreadPool.globalInstance().start(_Runnable(self._work))
+        return self
+
+    def _work(self):
+        try:
+            value = self.target(self)
+        except Exception as e:
+            self._running = False
+            self.signals.error.emit(e)
+            return
+        self._running = False
+        if self.cancelled:
+            self.signals.cancelled.emit(value)
+        else:
+            self.signals.finished.emit(value)
+
+    def status(self, text):
+        self.signals.progress.emit(text)
+
+    def emit(self, kind, payload):
+        if kind == "output":
+            self.stdout.write(payload)
+        elif kind == "error_output":
+            self.stderr.write(payload)
+        else:
+            self.signals.event.emit(kind, payload)
@@ -0,0 +1,359 @@
+import codecs
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+# Wall-clock limit for a single compile or run step, in seconds
+DEFAULT_TIMEOUT = 10
+# Bytes read from a pipe at a time when streaming output
+CHUNK_SIZE = 64 * 1024
+# Longest gap between peak-RSS samples of a running program, in seconds
+RSS_SAMPLE_SECONDS = 0.02
+
+
+class Limits:
+    """Optional limits enforced on a child process. None means unlimited."""
+
+    def __init__(self, cpu_seconds=None, memory_bytes=None, output_bytes=None):
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.output_bytes = output_bytes
+
+    def wrap(self, cmd):
+        """
+        `cmd` prefixed with a shell that sets the CPU and memory rlimits and
+        then execs it (POSIX only). This replaces preexec_fn, which isn't
+        safe while other threads are running, and run_process is called
+        from several threads at once.
+        """
+        steps = []
+        if self.cpu_seconds is not None:
+            # Soft limit sends SIGXCPU; the hard one a second later kills
+            seconds = max(1, int(self.cpu_seconds))
+            steps += [f"ulimit -S -t {seconds}", f"ulimit -H -t {seconds + 1}"]
+        if self.memory_bytes is not None:
+            steps.append(f"ulimit -v {self.memory_bytes // 1024}")
+        if not steps or sys.platform == "win32":
+            return cmd
+        argv = [cmd] if isinstance(cmd, str) else list(cmd)
+        return ["/bin/sh", "-c", "; ".join(steps) + '; exec "$@"', "sh", *argv]
+
+
+class ProcessResult:
+    """
+    Outcome of one process, with its resource usage. CPU times come from
+    wait4(); peak RSS is sampled from /proc while the program runs (Linux
+    only). Either is None where it cannot be measured.
+    """
+
+    def __init__(self, returncode, stdout, stderr, timed_out=False, cancelled=False,
+                 output_limited=False, wall_time=0.0, user_time=None, sys_time=None, max_rss=None):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.timed_out = timed_out
+        self.cancelled = cancelled
+        self.output_limited = output_limited
+        self.wall_time = wall_time
+        self.user_time = user_time
+        self.sys_time = sys_time
+        self.max_rss = max_rss
+
+    @property
+    def ok(self):
+        return self.returncode == 0 and not self.timed_out and not self.cancelled and not self.output_limited
+
+    @property
+    def cpu_time(self):
+        if self.user_time is None:
+            return None
+        return self.user_time + self.sys_time
+
+    @property
+    def signal_name(self):
+        if self.returncode is None or self.returncode >= 0 or sys.platform == "win32":
+            return None
+        try:
+            return signal.Signals(-self.returncode).name
+        except ValueError:
+            return f"signal {-self.returncode}"
+
+    def exit_status(self):
+        if self.cancelled:
+            return "stopped"
+        if self.timed_out:
+            return "timed out"
+        if self.output_limited:
+            return "output limit exceeded"
+        if self.signal_name == "SIGXCPU":
+            return "CPU limit exceeded"
+        if self.signal_name == "SIGXFSZ":
+            return "file size limit exceeded"
+        if self.signal_name:
+            return f"killed by {self.signal_name}"
+        return f"exit code {self.returncode}"
+
+    def summary(self):
+        parts = [f"wall {self.wall_time:.3f} s"]
+        if self.user_time is not None:
+            parts.append(f"cpu {self.user_time:.3f} s user + {self.sys_time:.3f} s sys")
+        if self.max_rss is not None:
+            parts.append(f"peak RSS {self.max_rss / (1024 * 1024):.1f} MB")
+        parts.append(self.exit_status())
+        return " | ".join(parts)
+
+
+class _Capture:
+    def __init__(self):
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+
+    def text(self):
+        return "".join(self.parts)
+
+
+def output_sinks(output=None, error_output=None):
+    """
+    Where to write a program's stdout and stderr: `output` (and
+    `error_output`, if given) when streaming, else two fresh captures whose
+    text() becomes the result's stdout and stderr.
+    """
+    if output is None:
+        return _Capture(), _Capture()
+    return output, error_output or output
+
+
+def kill_process_group(proc):
+    """Kill a process started by Job.run_process together with its children."""
+    # Don't poll(): that would reap the child before wait4() sees its usage.
+    if proc.returncode is not None:
+        return
+    try:
+        if sys.platform == "win32":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    except OSError:
+        proc.kill()
+
+
+class Job:
+    """
+    Runs `target(job)` on a worker thread. The target launches processes with
+    job.run_process() (from any number of threads); the UI thread calls poll()
+    (e.g. from after()) to pick up events, and cancel() to stop them all.
+
+    Events are (kind, payload) tuples: ("status", text) and any emit()ted by
+    the target while running, then exactly one of ("done", value) or
+    ("error", exception).
+    """
+
+    def __init__(self, target, timeout=DEFAULT_TIMEOUT):
+        self.target = target
+        self.timeout = timeout
+        self.events = queue.Queue()
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._procs = set()
+        self._thread = None
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+        return self
+
+    def _work(self):
+        try:
+            self.events.put(("done", self.target(self)))
+        except Exception as e:
+            self.events.put(("error", e))
+
+    def status(self, text):
+        self.events.put(("status", text))
+
+    def emit(self, kind, payload):
+        self.events.put((kind, payload))
+
+    def cancel(self):
+        self._cancelled.set()
+        with self._lock:
+            for proc in self._procs:
+                kill_process_group(proc)
+
+    def poll(self):
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def run_process(self, cmd, cwd=None, timeout=None, output=None, limits=None, stdin=None,
+                    error_output=None):
+        """
+        Run `cmd` to completion and return a ProcessResult with its resource
+        usage. If `output` is given (anything with a write() method, e.g. an
+        OutputBuffer), stdout and stderr are streamed into it as they arrive
+        instead of being collected in the result; `error_output` sends stderr
+        somewhere else. `stdin` may be text to feed the program or an open
+        binary file; by default the program sees an empty stdin.
+        """
+        if self.cancelled:
+            return ProcessResult(None, "", "", cancelled=True)
+
+        kwargs = {}
+        if sys.platform == "win32":
+            kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs["start_new_session"] = True
+            if limits is not None:
+                cmd = limits.wrap(cmd)
+
+        stdout_sink, stderr_sink = output_sinks(output, error_output)
+
+        if stdin is None:
+            stdin_arg = subprocess.DEVNULL
+        elif isinstance(stdin, str):
+            stdin_arg = subprocess.PIPE
+        else:
+            stdin_arg = stdin
+        counter = _OutputCounter(limits.output_bytes if limits else None)
+
+        started = time.perf_counter()
+        with self._lock:
+            proc = subprocess.Popen(cmd, cwd=cwd, stdin=stdin_arg, stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE, **kwargs)
+            self._procs.add(proc)
+        if self.cancelled:
+            kill_process_group(proc)
+
+        def on_limit():
+            counter.exceeded = True
+            kill_process_group(proc)
+
+        readers = [threading.Thread(target=_pump, args=(pipe, sink, counter, on_limit), daemon=True)
+                   for pipe, sink in ((proc.stdout, stdout_sink), (proc.stderr, stderr_sink))]
+        if isinstance(stdin, str):
+            readers.append(threading.Thread(target=_feed, args=(proc.stdin, stdin), daemon=True))
+        for reader in readers:
+            reader.start()
+
+        usage = {}
+        waiter = threading.Thread(target=_wait, args=(proc, usage), daemon=True)
+        waiter.start()
+        timed_out = False
+        try:
+            waiter.join(timeout or self.timeout)
+            if waiter.is_alive():
+                timed_out = True
+                kill_process_group(proc)
+                waiter.join()
+            for reader in readers:
+                reader.join()
+        finally:
+            with self._lock:
+                self._procs.discard(proc)
+        wall_time = time.perf_counter() - started
+
+        return ProcessResult(
+            proc.returncode,
+            stdout_sink.text() if output is None else "",
+            stderr_sink.text() if output is None else "",
+            timed_out=timed_out,
+            cancelled=self.cancelled and not timed_out,
+            output_limited=counter.exceeded,
+            wall_time=wall_time,
+            **usage,
+        )
+
+
+class _OutputCounter:
+    def __init__(self, limit):
+        self.limit = limit
+        self.total = 0
+        self.exceeded = False
+        self._lock = threading.Lock()
+
+    def add(self, count):
+        with self._lock:
+            self.total += count
+            return self.limit is not None and self.total > self.limit
+
+
+def _vm_hwm(pid="self"):
+    """Peak RSS in bytes of `pid`'s current program, or None once it has exited (or off Linux)."""
+    try:
+        with open(f"/proc/{pid}/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _wait(proc, usage):
+    if not hasattr(os, "wait4"):
+        proc.wait()
+        return
+    # wait4()'s ru_maxrss also counts what the child inherited from this
+    # process before exec, i.e. the app's own footprint. VmHWM belongs to the
+    # exec'd program alone but is gone once it exits, so sample it until then.
+    max_rss = None
+    delay = 0.001
+    while True:
+        hwm = _vm_hwm(proc.pid)
+        if hwm is None:
+            break
+        max_rss = max(max_rss or 0, hwm)
+        time.sleep(delay)
+        delay = min(delay * 2, RSS_SAMPLE_SECONDS)
+    _, status, rusage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # Sampling can miss growth just before exit. Nothing inherited exceeds
+    # this process's own peak, so a larger ru_maxrss is the program's exact one.
+    inherited = _vm_hwm()
+    if inherited is not None and rusage.ru_maxrss * 1024 > inherited:
+        max_rss = rusage.ru_maxrss * 1024
+    usage.update(user_time=rusage.ru_utime, sys_time=rusage.ru_stime, max_rss=max_rss)
+
+
+def _feed(pipe, text):
+    try:
+        with pipe:
+            pipe.write(text.encode("utf-8"))
+    except (BrokenPipeError, OSError):
+        # The program exited without reading all of its input.
+        pass
+
+
+def _pump(pipe, sink, counter, on_limit):
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with pipe:
+        while True:
+            chunk = pipe.read1(CHUNK_SIZE)
+            if not chunk:
+                break
+            if counter.exceeded:
+                continue
+            if counter.add(len(chunk)):
+                on_limit()
+                continue
+            sink.write(decoder.decode(chunk))
+    sink.write(decoder.decode(b"", final=True))
@@ -0,0 +1,213 @@
+import bisect
+import hashlib
+import heapq
+import math
+import re
+import threading
+
+_TOPIC_SPLIT_RE = re.compile(r"-{10,}")
+_TOKEN_RE = re.compile(r"\w+")
+
+# Weight of a match in a topic title relative to one in its body
+TITLE_BOOST = 3.0
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Cap on vocabulary terms a short prefix expands to, most frequent first
+MAX_EXPANSIONS = 64
+DEFAULT_LIMIT = 50
+
+
+def split_topics(text):
+    """
+    (block number, title, body) for each topic of a concepts file: blocks
+    separated by a line of dashes, the first line being the title. Block
+    numbers count empty blocks too, so they match the page's alternating
+    colours.
+    """
+    topics = []
+    for number, block in enumerate(_TOPIC_SPLIT_RE.split(text)):
+        block = block.strip()
+        if not block:
+            continue
+        lines = block.splitlines()
+        topics.append((number, lines[0].strip(), "\n".join(lines[1:]).strip()))
+    return topics
+
+
+def tokenize(text):
+    # Typographic apostrophes would otherwise split "It’s" into two words
+    return _TOKEN_RE.findall(text.lower().replace("’", "'").replace("'", ""))
+
+
+class Hit:
+    """A matching paragraph: `line` counts from the topic's title line (0)."""
+
+    def __init__(self, topic, line, score, is_title):
+        self.topic = topic
+        self.line = line
+        self.score = score
+        self.is_title = is_title
+
+
+class SearchIndex:
+    """
+    Inverted index over concept topics. Every title and every paragraph of
+    a body (lines up to a blank one) is a document; postings map each term
+    to the documents containing it. Queries match each word as a prefix
+    through a sorted vocabulary, all words must match, and hits are ranked
+    by BM25 with title matches boosted.
+
+    Consecutive queries that only extend the last word (typing) are
+    answered from the previous query's candidates.
+    """
+
+    def __init__(self, topics):
+        self.topics = topics
+        # Per document: (topic, line, length in tokens, is title)
+        self.docs = []
+        self.postings = {}
+        for topic, (_, title, body) in enumerate(topics):
+            self._add(topic, 0, title, True)
+            lines = body.splitlines()
+            start = None
+            for i, line in enumerate(lines + [""]):
+                if line.strip() and start is None:
+                    start = i
+                elif not line.strip() and start is not None:
+                    self._add(topic, start + 1, "\n".join(lines[start:i]), False)
+                    start = None
+        self.vocabulary = sorted(self.postings)
+        count = len(self.docs) or 1
+        self.average_length = sum(doc[2] for doc in self.docs) / count
+        self.idf = {term: math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                    for term, posting in self.postings.items()}
+        # BM25 length normalisation and title boost, precomputed per document
+        self.norms = [K1 * (1 - B + B * length / self.average_length) for _, _, length, _ in self.docs]
+        self.boosts = [(K1 + 1) * (TITLE_BOOST if is_title else 1.0) for _, _, _, is_title in self.docs]
+        self._last = None
+
+    def _add(self, topic, line, text, is_title):
+        tokens = tokenize(text)
+        if not tokens:
+            return
+        doc = len(self.docs)
+        self.docs.append((topic, line, len(tokens), is_title))
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            self.postings.setdefault(token, []).append((doc, tf))
+
+    def expand(self, prefix):
+        """
+        Vocabulary terms starting with `prefix`, via bisect on the sorted
+        vocabulary, and whether the list was cut to MAX_EXPANSIONS.
+        """
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\uffff", start)
+        terms = self.vocabulary[start:end]
+        if len(terms) > MAX_EXPANSIONS:
+            return heapq.nlargest(MAX_EXPANSIONS, terms, key=lambda term: len(self.postings[term])), True
+        return terms, False
+
+    def _scores(self, terms, word, candidates):
+        scores = {}
+        for term in terms:
+            # Exact words outrank words they are merely a prefix of
+            weight = self.idf[term] * (1.0 if term == word else 0.5)
+            for doc, tf in self.postings[term]:
+                if candidates is not None and doc not in candidates:
+                    continue
+                score = weight * tf * self.boosts[doc] / (tf + self.norms[doc])
+                if score > scores.get(doc, 0.0):
+                    scores[doc] = score
+        return scores
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Best `limit` hits for `query`, highest score first."""
+        words = tokenize(query)
+        if not words:
+            self._last = None
+            return []
+        candidates = None
+        last = self._last
+        if last is not None and last[0] == words[:-1] and words[-1].startswith(last[1]):
+            candidates = last[2]
+
+        totals = None
+        complete = True
+        for word in words:
+            terms, truncated = self.expand(word)
+            complete = complete and not truncated
+            scores = self._scores(terms, word, candidates)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {doc: total + scores[doc] for doc, total in totals.items() if doc in scores}
+            if not totals:
+                break
+        # A capped expansion may have left out documents a longer prefix would match.
+        self._last = (words[:-1], words[-1], set(totals)) if complete else None
+
+        best = heapq.nlargest(limit, totals.items(), key=lambda item: item[1])
+        return [Hit(*self.docs[doc][:2], score, self.docs[doc][3]) for doc, score in best]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def content_digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def get_index(digest, load_topics):
+    """
+    SearchIndex for the content version `digest` (see content_digest()),
+    built from load_topics() only the first time that version is seen.
+    """
+    with _indexes_lock:
+        index = _indexes.get(digest)
+    if index is None:
+        index = SearchIndex(load_topics())
+        with _indexes_lock:
+            _indexes.clear()
+            _indexes[digest] = index
+    return index
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import statistics
+    import time
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "db", "concepts_raw.txt")
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    for copies in (1, 100):
+        # A content pack `copies` times larger: the same topics under distinct titles
+        scaled = text if copies == 1 else "".join(
+            f"{title} ({n + 1})\n{body}\n{'-' * 40}\n"
+            for n in range(copies) for _, title, body in split_topics(text))
+        topics = split_topics(scaled)
+        started = time.perf_counter()
+        index = SearchIndex(topics)
+        built = time.perf_counter() - started
+
+        words = [term for term in index.vocabulary if len(term) > 3]
+        queries = []
+        for _ in range(200):
+            word = random.choice(words)
+            queries += [word[:1], word[:3], word, f"{random.choice(words)} {word[:4]}"]
+        samples = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query)
+            samples.append(time.perf_counter() - started)
+        samples.sort()
+        print(f"{len(scaled) / 1024:8.0f} KB, {len(topics):5} topics, {len(index.docs):6} paragraphs: "
+              f"build {built * 1000:6.1f} ms, query median {statistics.median(samples) * 1000:5.2f} ms, "
+              f"p99 {samples[int(len(samples) * 0.99)] * 1000:5.2f} ms, max {samples[-1] * 1000:5.2f} ms")
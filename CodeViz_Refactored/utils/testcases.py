@@ -0,0 +1,166 @@
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+from utils.build_cache import compile_source
+from utils.output_buffer import OutputBuffer
+from utils.runner import Limits
+from utils.workspace import Workspace
+
+PASS = "pass"
+FAIL = "fail"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+# Cap on what a single test case may print before it is stopped
+CASE_OUTPUT_LIMIT = 256 * 1024 * 1024
+
+
+class TestCase:
+    def __init__(self, input_path, expected_path, name=None):
+        self.input_path = input_path
+        self.expected_path = expected_path
+        self.name = name or os.path.splitext(os.path.basename(input_path))[0]
+
+
+class CaseResult:
+    def __init__(self, case, status, wall_time=0.0, detail=""):
+        self.case = case
+        self.status = status
+        self.wall_time = wall_time
+        self.detail = detail
+
+
+def find_cases(folder):
+    """Pair up `<name>.in` / `<name>.out` (or `.expected`) files in a folder."""
+    cases = []
+    for input_path in sorted(glob.glob(os.path.join(folder, "*.in"))):
+        stem = os.path.splitext(input_path)[0]
+        for suffix in (".out", ".expected"):
+            if os.path.exists(stem + suffix):
+                cases.append(TestCase(input_path, stem + suffix))
+                break
+    return cases
+
+
+class StreamingDiff:
+    """
+    Output sink that compares program output line by line against an
+    expected-output file as it is produced, so neither side is ever held in
+    memory in full. Trailing whitespace and trailing blank lines are ignored.
+    """
+
+    def __init__(self, expected_path):
+        self._expected = open(expected_path, "r", encoding="utf-8", errors="replace")
+        # The expected line being matched (None between lines) and how much of it has arrived so far;
+        # the actual line is never buffered past the expected one, however long it runs.
+        self._want = None
+        self._shown = ""
+        self._partial = ""
+        self.line = 0
+        self.mismatch = None
+
+    def write(self, text):
+        if self.mismatch is not None or not text:
+            return
+        *complete, last = text.split("\n")
+        for piece in complete:
+            self._feed(piece)
+            if self.mismatch is None:
+                self._end_line()
+            if self.mismatch is not None:
+                return
+        self._feed(last)
+
+    def _start_line(self):
+        self.line += 1
+        expected = self._expected.readline()
+        # Past the end of the expected output only blank lines may follow.
+        self._shown = expected.rstrip("\r\n") if expected != "" else "<end of output>"
+        self._want = expected.rstrip("\r\n").rstrip()
+
+    def _feed(self, piece):
+        if not piece:
+            return
+        if self._want is None:
+            self._start_line()
+        start = len(self._partial)
+        taken = piece[:max(len(self._want) - start, 0)]
+        self._partial += taken
+        # Whatever runs past the expected line may only be trailing whitespace
+        if taken != self._want[start:start + len(taken)] or piece[len(taken):].strip():
+            self.mismatch = (self.line, self._shown, (self._partial + piece[len(taken):len(taken) + 20]).rstrip())
+
+    def _end_line(self):
+        if self._want is None:
+            self._start_line()
+        if len(self._partial) < len(self._want):
+            self.mismatch = (self.line, self._shown, self._partial.rstrip())
+        self._want = None
+        self._partial = ""
+
+    def finish(self):
+        """Return None if the output matched, else (line, expected, actual)."""
+        try:
+            if self.mismatch is None and self._want is not None:
+                self._end_line()
+            if self.mismatch is None:
+                for expected in self._expected:
+                    self.line += 1
+                    if expected.strip():
+                        self.mismatch = (self.line, expected.rstrip("\r\n"), "<end of output>")
+                        break
+            return self.mismatch
+        finally:
+            self._expected.close()
+
+
+def run_case(job, executable, case, timeout):
+    diff = StreamingDiff(case.expected_path)
+    errors = OutputBuffer(max_lines=20)
+    try:
+        with open(case.input_path, "rb") as stdin, Workspace() as workspace:
+            result = job.run_process([executable], cwd=workspace.path, timeout=timeout, stdin=stdin,
+                                     output=diff, error_output=errors,
+                                     limits=Limits(cpu_seconds=timeout, output_bytes=CASE_OUTPUT_LIMIT))
+    finally:
+        mismatch = diff.finish()
+
+    if result.timed_out or result.exit_status() == "CPU limit exceeded":
+        return CaseResult(case, TIMEOUT, result.wall_time, f"no result after {timeout}s")
+    if result.cancelled:
+        return CaseResult(case, ERROR, result.wall_time, "stopped")
+    if result.returncode != 0 or result.output_limited:
+        detail = result.exit_status()
+        stderr = errors.text().strip()
+        if stderr:
+            detail += ": " + stderr.splitlines()[-1]
+        return CaseResult(case, ERROR, result.wall_time, detail)
+    if mismatch is not None:
+        line, expected, actual = mismatch
+        return CaseResult(case, FAIL, result.wall_time, f"line {line}: expected {expected!r}, got {actual!r}")
+    return CaseResult(case, PASS, result.wall_time)
+
+
+def run_cases(job, source, cases, timeout, workers=None):
+    """
+    Compile `source` once, then run every case concurrently, each in its own
+    process. Each CaseResult is emitted as a ("case", result) job event as
+    soon as it is known. Returns the failed compile ProcessResult, or None.
+    """
+    job.status("Compiling...")
+    executable, failed = compile_source(job, source)
+    if failed is not None:
+        return failed
+
+    job.status(f"Running {len(cases)} test case{'s' if len(cases) != 1 else ''}...")
+
+    def run_one(case):
+        try:
+            result = run_case(job, executable, case, timeout)
+        except OSError as e:
+            result = CaseResult(case, ERROR, detail=str(e))
+        job.emit("case", result)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        list(pool.map(run_one, cases))
+    return None
@@ -0,0 +1,211 @@
+import json
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.paths import user_cache_dir
+
+# Tools probed at startup, with the arguments that make each print its version
+TOOLS = {
+    "gcc": ["--version"],
+    "g++": ["--version"],
+    "javac": ["-version"],
+    "java": ["-version"],
+    "python": ["--version"],
+}
+# Optional flags checked once per binary so callers needn't find out by failing
+FLAG_PROBES = {
+    "gcc": ["-fdiagnostics-format=json"],
+    "g++": ["-fdiagnostics-format=json"],
+}
+# Executable names tried in order for a tool
+ALIASES = {"python": ["python", "python3"]}
+
+# Tools each editor language needs
+LANGUAGE_TOOLS = {
+    "C": ["gcc"],
+    "C++": ["g++"],
+    "Python": ["python"],
+    "Java": ["javac", "java"],
+}
+
+PROBE_TIMEOUT = 15
+CACHE_NAME = "toolchains.json"
+
+
+class Tool:
+    """A probed executable. `path` is None when the tool isn't installed."""
+
+    def __init__(self, name, path=None, version="", mtime=None, flags=()):
+        self.name = name
+        self.path = path
+        self.version = version
+        self.mtime = mtime
+        self.flags = list(flags)
+
+    @property
+    def available(self):
+        return self.path is not None
+
+    def supports(self, flag):
+        return flag in self.flags
+
+    def to_json(self):
+        return {"name": self.name, "version": self.version, "mtime": self.mtime, "flags": self.flags}
+
+
+def _stamp(path):
+    # Resolve symlinks (update-alternatives, pyenv shims) so an upgrade changes the stamp.
+    try:
+        return os.stat(os.path.realpath(path)).st_mtime
+    except OSError:
+        return None
+
+
+def _accepts_flag(path, flag):
+    try:
+        result = subprocess.run([path, flag, "-fsyntax-only", "-x", "c", os.devnull],
+                                capture_output=True, timeout=PROBE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
+def probe(name, path):
+    """Run `path` to find its version and which FLAG_PROBES it accepts."""
+    try:
+        result = subprocess.run([path, *TOOLS.get(name, ["--version"])], capture_output=True, text=True,
+                                timeout=PROBE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return Tool(name)
+    lines = (result.stdout.strip() or result.stderr.strip()).splitlines()
+    flags = [flag for flag in FLAG_PROBES.get(name, ()) if _accepts_flag(path, flag)]
+    return Tool(name, path, lines[0] if lines else "", _stamp(path), flags)
+
+
+class ToolchainRegistry:
+    """
+    Finds gcc, g++, javac, java and python once, probing them in parallel on
+    a background thread. Results are persisted per binary path and reused
+    for as long as the binary's mtime is unchanged, so a normal startup
+    spawns nothing. Call start() early; get() and friends wait for it.
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or os.path.join(user_cache_dir(), CACHE_NAME)
+        self._tools = {}
+        self._known = {}
+        self._ready = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._discover, daemon=True)
+                self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        self.start()
+        self._ready.wait(timeout)
+        return self
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        staging = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(staging, "w", encoding="utf-8") as f:
+                json.dump(self._known, f, indent=1, sort_keys=True)
+            os.replace(staging, self.cache_path)
+        except OSError:
+            pass
+
+    def _lookup(self, name, path):
+        entry = self._known.get(path)
+        stamp = _stamp(path)
+        if entry and entry["name"] == name and stamp is not None and entry["mtime"] == stamp:
+            return Tool(name, path, entry["version"], entry["mtime"], entry["flags"])
+        tool = probe(name, path)
+        if tool.available:
+            with self._lock:
+                self._known[path] = tool.to_json()
+        return tool
+
+    def _resolve(self, name):
+        for candidate in ALIASES.get(name, [name]):
+            path = shutil.which(candidate)
+            if path:
+                return self._lookup(name, path)
+        return Tool(name)
+
+    def _discover(self):
+        self._known = self._load()
+        try:
+            with ThreadPoolExecutor(max_workers=len(TOOLS)) as pool:
+                tools = dict(zip(TOOLS, pool.map(self._resolve, TOOLS)))
+        except Exception:
+            tools = {}
+        self._tools = tools
+        self._save()
+        self._ready.set()
+
+    def get(self, name):
+        self.wait()
+        return self._tools.get(name) or Tool(name)
+
+    def path(self, name):
+        return self.get(name).path
+
+    def missing(self, language):
+        """Tools `language` needs that aren't installed."""
+        return [name for name in LANGUAGE_TOOLS.get(language, []) if not self.get(name).available]
+
+    def version(self, executable):
+        """Version line of any compiler, by name or path, cached like the standard tools."""
+        self.wait()
+        path = shutil.which(executable) or executable
+        for tool in self._tools.values():
+            if tool.path == path:
+                return tool.version
+        tool = self._lookup(os.path.basename(path), path)
+        self._save()
+        return tool.version
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_registry():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ToolchainRegistry()
+        return _default
+
+
+if __name__ == "__main__":
+    import time
+
+    cache_path = os.path.join(user_cache_dir(), CACHE_NAME)
+    for label in ("cold (no cache)", "warm (cached)"):
+        if label.startswith("cold") and os.path.exists(cache_path):
+            os.remove(cache_path)
+        started = time.perf_counter()
+        registry = ToolchainRegistry().wait()
+        print(f"{label:16} {(time.perf_counter() - started) * 1000:7.1f} ms")
+    for name in TOOLS:
+        tool = registry.get(name)
+        print(f"  {name:7} {tool.path or 'not found':30} {tool.version} {' '.join(tool.flags)}")
@@ -0,0 +1,221 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from utils.build_cache import LINK_FLAGS
+from utils.runner import Job, Limits
+from utils.toolchains import get_registry
+from utils.workspace import Workspace
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+EXAMPLES_PATH = os.path.join(ASSETS_DIR, "c_code_examples_extended.json")
+RESULTS_PATH = os.path.join(ASSETS_DIR, "c_code_examples_results.json")
+
+# Flags every example is built with; warnings are recorded, not fatal
+FLAGS = ["-Wall", "-Wextra", *LINK_FLAGS]
+# Per-example limit for each of the compile and run steps, in seconds
+DEFAULT_TIMEOUT = 10
+# Cap on what one example may print
+OUTPUT_LIMIT = 1024 * 1024
+
+PASS = "pass"
+NEW = "new"
+CACHED = "cached"
+DRIFT = "drift"
+COMPILE_ERROR = "compile error"
+RUN_ERROR = "run error"
+TIMEOUT = "timeout"
+
+FAILED = (DRIFT, COMPILE_ERROR, RUN_ERROR, TIMEOUT)
+
+
+def source_hash(code, compiler_version):
+    """Key of a recorded result: the code, the compiler that built it, and FLAGS."""
+    digest = hashlib.sha256()
+    for part in (code, compiler_version, *FLAGS):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class Verdict:
+    def __init__(self, title, status, record, detail=""):
+        self.title = title
+        self.status = status
+        self.record = record
+        self.detail = detail
+
+
+def verify_one(job, compiler, example, digest, golden, timeout):
+    """Compile and run one example; `golden` is its recorded entry, if any."""
+    title = example.get("title", "Untitled")
+    record = {"sha256": digest}
+    if golden is not None and "stdout" in golden:
+        record["stdout"] = golden["stdout"]
+    with Workspace() as workspace:
+        source_path = workspace.artifact(".c")
+        with open(source_path, "w", encoding="utf-8") as f:
+            f.write(example.get("code", ""))
+        executable = workspace.artifact()
+        built = job.run_process([compiler, os.path.basename(source_path), "-o", executable, *FLAGS],
+                                cwd=workspace.path, timeout=timeout)
+        record["compile_time"] = round(built.wall_time, 4)
+        record["warnings"] = built.stderr.strip().splitlines() if built.ok else []
+        if built.timed_out:
+            return Verdict(title, TIMEOUT, record, f"compile took over {timeout}s")
+        if not built.ok:
+            lines = built.stderr.strip().splitlines()
+            # The first line is often just "In function 'main':"; show the actual error
+            errors = [line for line in lines if "error" in line or "undefined reference" in line]
+            return Verdict(title, COMPILE_ERROR, record, (errors or lines or [built.exit_status()])[0].strip())
+
+        ran = job.run_process([executable], cwd=workspace.path, timeout=timeout,
+                              limits=Limits(cpu_seconds=timeout, output_bytes=OUTPUT_LIMIT))
+    record["run_time"] = round(ran.wall_time, 4)
+    if ran.timed_out or ran.exit_status() == "CPU limit exceeded":
+        return Verdict(title, TIMEOUT, record, f"no result after {timeout}s")
+    if not ran.ok:
+        return Verdict(title, RUN_ERROR, record, ran.exit_status())
+
+    if "stdout" not in record:
+        record["stdout"] = ran.stdout
+        return Verdict(title, NEW, record)
+    if ran.stdout != record["stdout"]:
+        expected, actual = record["stdout"].splitlines(), ran.stdout.splitlines()
+        for line, (want, got) in enumerate(zip(expected + ["<end of output>"], actual + ["<end of output>"]), 1):
+            if want != got:
+                break
+        record["drifted_stdout"] = ran.stdout
+        return Verdict(title, DRIFT, record, f"line {line}: expected {want!r}, got {got!r}")
+    return Verdict(title, PASS, record)
+
+
+def load_results(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_results(path, results):
+    staging = f"{path}.{os.getpid()}.tmp"
+    with open(staging, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+    os.replace(staging, path)
+
+
+def verify(examples, recorded, compiler, compiler_version, timeout=DEFAULT_TIMEOUT, workers=None,
+           update=False, force=False, progress=None):
+    """
+    Check every example against its recorded entry. Examples whose hash
+    matches a passing entry are skipped. Returns (verdicts, new entries):
+    drifted entries keep their golden stdout unless `update` is set.
+    """
+    job = Job(None, timeout=timeout)
+    verdicts = [None] * len(examples)
+    pending = []
+    for index, example in enumerate(examples):
+        title = example.get("title", "Untitled")
+        digest = source_hash(example.get("code", ""), compiler_version)
+        golden = recorded.get(title)
+        if golden is not None and golden.get("sha256") == digest and not force:
+            verdicts[index] = Verdict(title, CACHED, golden)
+        else:
+            pending.append((index, example, digest, golden))
+
+    def run_one(item):
+        index, example, digest, golden = item
+        try:
+            verdict = verify_one(job, compiler, example, digest, golden, timeout)
+        except OSError as e:
+            verdict = Verdict(example.get("title", "Untitled"), RUN_ERROR, {"sha256": digest}, str(e))
+        verdicts[index] = verdict
+        if progress is not None:
+            progress(verdict)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        try:
+            list(pool.map(run_one, pending))
+        except KeyboardInterrupt:
+            job.cancel()
+            raise
+
+    entries = {}
+    for verdict in verdicts:
+        record = dict(verdict.record)
+        drifted = record.pop("drifted_stdout", None)
+        if verdict.status == DRIFT and update:
+            record["stdout"] = drifted
+        elif verdict.status in FAILED:
+            # Re-verify next time; a passing hash would hide the failure.
+            record["sha256"] = None
+        entries[verdict.title] = record
+    return verdicts, entries
+
+
+def missing_images(examples, base):
+    missing = []
+    for example in examples:
+        image = example.get("output_image")
+        if image and not os.path.exists(os.path.join(base, image)):
+            missing.append((example.get("title", "Untitled"), image))
+    return missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.verify_examples",
+        description="Compile and run every shipped C example and compare its output with the recorded golden copy.")
+    parser.add_argument("--examples", default=EXAMPLES_PATH, help="examples JSON file")
+    parser.add_argument("--results", default=RESULTS_PATH, help="golden results file (created if missing)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds per compile and per run")
+    parser.add_argument("--jobs", type=int, default=None, help="examples verified at once (default: all cores)")
+    parser.add_argument("--update", action="store_true", help="accept drifted output as the new golden copy")
+    parser.add_argument("--force", action="store_true", help="re-verify examples whose source is unchanged")
+    parser.add_argument("--require-images", action="store_true", help="fail when an output_image is missing")
+    args = parser.parse_args(argv)
+
+    with open(args.examples, "r", encoding="utf-8") as f:
+        examples = json.load(f)
+    compiler = get_registry().path("gcc")
+    if compiler is None:
+        print("gcc not found; install a C compiler to verify examples", file=sys.stderr)
+        return 2
+    compiler_version = get_registry().version(compiler)
+
+    def progress(verdict):
+        line = f"{verdict.status:>13}  {verdict.title}"
+        if verdict.detail:
+            line += f"  ({verdict.detail})"
+        print(line, flush=True)
+
+    recorded = load_results(args.results).get("examples", {})
+    verdicts, entries = verify(examples, recorded, compiler, compiler_version, timeout=args.timeout,
+                               workers=args.jobs, update=args.update, force=args.force, progress=progress)
+    save_results(args.results, {"compiler": compiler_version, "flags": FLAGS, "examples": entries})
+
+    counts = {}
+    for verdict in verdicts:
+        counts[verdict.status] = counts.get(verdict.status, 0) + 1
+    print(", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+    warned = sum(1 for record in entries.values() if record.get("warnings"))
+    if warned:
+        print(f"{warned} example{'s' if warned != 1 else ''} compiled with warnings; see {args.results}")
+
+    missing = missing_images(examples, os.path.dirname(os.path.dirname(os.path.abspath(args.examples))))
+    for title, image in missing:
+        print(f"missing output image: {image} ({title})")
+
+    failed = [verdict for verdict in verdicts if verdict.status in FAILED and not
+              (verdict.status == DRIFT and args.update)]
+    if failed or (missing and args.require_images):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
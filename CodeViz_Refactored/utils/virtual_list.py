@@ -0,0 +1,135 @@
+import customtkinter as ctk
+from tkinter import Scrollbar
+
+# Pixels moved per mouse-wheel notch
+WHEEL_STEP = 40
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list of fixed-size rows that only ever creates enough row
+    widgets to fill its length. Scrolling moves and re-labels the same
+    widgets instead of creating one per item, so a list of thousands costs
+    the same as a list of ten.
+
+    create_row(parent, size) builds one CustomTkinter row widget;
+    update_row(widget, item) points an existing widget at `item`. Rows are
+    stacked top to bottom, or left to right with orientation="horizontal".
+    """
+
+    def __init__(self, master, create_row, update_row, row_size=40, orientation="vertical", **kwargs):
+        super().__init__(master, **kwargs)
+        self.create_row = create_row
+        self.update_row = update_row
+        self.row_size = row_size
+        self.horizontal = orientation == "horizontal"
+        self.items = []
+        self.offset = 0
+        self.rows = []
+        self.shown = []
+        # Rows are placed, not packed, so size the list from its own width/height.
+        self.pack_propagate(False)
+        self.grid_propagate(False)
+
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        if self.horizontal:
+            self.scrollbar = Scrollbar(self, orient="horizontal", command=self.view)
+            self.scrollbar.pack(side="bottom", fill="x")
+        else:
+            self.scrollbar = Scrollbar(self, command=self.view)
+            self.scrollbar.pack(side="right", fill="y")
+        self.viewport.pack(fill="both", expand=True)
+
+        self.viewport.bind("<Configure>", lambda event: self.refresh())
+        self.bind_wheel(self.viewport)
+
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self.on_wheel)
+        # X11 reports the wheel as buttons 4 and 5
+        widget.bind("<Button-4>", lambda event: self.scroll_by(-WHEEL_STEP))
+        widget.bind("<Button-5>", lambda event: self.scroll_by(WHEEL_STEP))
+
+    def on_wheel(self, event):
+        notches = event.delta / 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll_by(-int(notches * WHEEL_STEP))
+
+    def set_items(self, items):
+        self.items = items
+        self.offset = 0
+        self.refresh()
+
+    def viewport_length(self):
+        # place() scales coordinates by the CTk widget scaling, so work in unscaled units
+        pixels = self.viewport.winfo_width() if self.horizontal else self.viewport.winfo_height()
+        return int(pixels / self._get_widget_scaling())
+
+    def content_length(self):
+        return len(self.items) * self.row_size
+
+    def max_offset(self):
+        return max(0, self.content_length() - self.viewport_length())
+
+    def scroll_by(self, pixels):
+        self.scroll_to(self.offset + pixels)
+
+    def scroll_to(self, offset):
+        offset = min(max(0, int(offset)), self.max_offset())
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def show(self, item):
+        """Scroll just far enough for `item` to be fully visible."""
+        try:
+            start = self.items.index(item) * self.row_size
+        except ValueError:
+            return
+        if start < self.offset:
+            self.scroll_to(start)
+        elif start + self.row_size > self.offset + self.viewport_length():
+            self.scroll_to(start + self.row_size - self.viewport_length())
+
+    def view(self, action, *args):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if action == "moveto":
+            self.scroll_to(float(args[0]) * self.content_length())
+        elif action == "scroll":
+            step = self.viewport_length() if args[1] == "pages" else self.row_size
+            self.scroll_by(int(args[0]) * step)
+
+    def ensure_rows(self, count):
+        while len(self.rows) < count:
+            row = self.create_row(self.viewport, self.row_size)
+            self.bind_wheel(row)
+            self.rows.append(row)
+            self.shown.append(None)
+
+    def refresh(self):
+        length = self.viewport_length()
+        self.offset = min(self.offset, self.max_offset())
+        first = self.offset // self.row_size
+        # One extra row covers the partly visible one at the end
+        visible = min(len(self.items) - first, length // self.row_size + 2)
+        self.ensure_rows(visible)
+
+        shift = self.offset % self.row_size
+        for slot, row in enumerate(self.rows):
+            if slot >= visible:
+                row.place_forget()
+                self.shown[slot] = None
+                continue
+            item = self.items[first + slot]
+            if self.shown[slot] != item:
+                self.update_row(row, item)
+                self.shown[slot] = item
+            position = slot * self.row_size - shift
+            if self.horizontal:
+                row.place(x=position, y=0, rely=0.5, anchor="w")
+            else:
+                row.place(x=0, y=position, relwidth=1)
+
+        total = self.content_length()
+        if total <= length or not total:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + length) / total)
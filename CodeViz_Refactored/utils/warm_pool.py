@@ -0,0 +1,302 @@
+import codecs
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from utils.runner import ProcessResult, DEFAULT_TIMEOUT, kill_process_group, output_sinks
+from utils.toolchains import get_registry
+
+PYTHON_WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "py_worker.py")
+
+# Snippets a worker runs before it is replaced by a fresh one
+MAX_JOBS_PER_WORKER = 100
+# Extra time a worker gets to answer after the snippet's own timeout
+GRACE_SECONDS = 5
+POLL_SECONDS = 0.05
+
+class WorkerDied(Exception):
+    pass
+
+
+class Worker:
+    """One pre-started runtime speaking the py_worker.py framing."""
+
+    def __init__(self, cmd, interrupt_signal=None):
+        kwargs = {}
+        if sys.platform == "win32":
+            kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs["start_new_session"] = True
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL, **kwargs)
+        self.interrupt_signal = interrupt_signal
+        self.jobs = 0
+
+    @property
+    def alive(self):
+        return self.proc.poll() is None
+
+    def request(self, op, source, output, error_output, name="-", cwd="", timeout=0, limits=None):
+        """
+        Send one request and write the output frames of the reply to
+        `output` / `error_output` as they arrive. Returns the DONE fields.
+        """
+        cwd_bytes = (cwd or "").encode("utf-8")
+        source_bytes = source.encode("utf-8")
+        bounds = [-1, -1, -1]
+        if limits is not None:
+            for i, value in enumerate((limits.cpu_seconds, limits.memory_bytes, limits.output_bytes)):
+                if value is not None:
+                    bounds[i] = value
+        try:
+            self.proc.stdin.write(f"{op} {timeout} {name} {' '.join(map(str, bounds))} "
+                                  f"{len(cwd_bytes)} {len(source_bytes)}\n".encode())
+            self.proc.stdin.write(cwd_bytes + source_bytes)
+            self.proc.stdin.flush()
+        except OSError:
+            raise WorkerDied()
+        sinks = {b"OUT": output, b"ERR": error_output}
+        decoders = {tag: codecs.getincrementaldecoder("utf-8")(errors="replace") for tag in sinks}
+        while True:
+            header = self.proc.stdout.readline().split()
+            if len(header) == 2 and header[0] in sinks:
+                data = self.proc.stdout.read(int(header[1]))
+                sinks[header[0]].write(decoders[header[0]].decode(data))
+                continue
+            for tag, decoder in decoders.items():
+                sinks[tag].write(decoder.decode(b"", final=True))
+            if len(header) != 7 or header[0] != b"DONE":
+                raise WorkerDied()
+            return header[1:]
+
+    def interrupt(self):
+        """Stop the running snippet, killing the whole worker if it can't do that itself."""
+        if self.interrupt_signal is not None and self.alive:
+            try:
+                os.kill(self.proc.pid, self.interrupt_signal)
+                return
+            except OSError:
+                pass
+        self.close()
+
+    def close(self):
+        kill_process_group(self.proc)
+        try:
+            self.proc.wait(timeout=GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            pass
+        for pipe in (self.proc.stdin, self.proc.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+
+class WarmPool:
+    """
+    Keeps `size` worker runtimes started ahead of time and hands snippets to
+    them, so a Python run costs a fork instead of interpreter startup.
+    Workers that crash, time out, get stopped or reach MAX_JOBS_PER_WORKER
+    are replaced in the background.
+
+    `command()` returns the worker's argv, or None if the runtime isn't
+    installed; it may be slow and is only called off the UI thread by warm().
+    """
+
+    def __init__(self, command, interrupt_signal=None, size=1, max_jobs=MAX_JOBS_PER_WORKER):
+        self.command = command
+        self.interrupt_signal = interrupt_signal
+        self.size = size
+        self.max_jobs = max_jobs
+        self._idle = []
+        self._starting = 0
+        self._lock = threading.Lock()
+        self._argv = None
+
+    def _spawn(self):
+        if self._argv is None:
+            self._argv = self.command() or False
+        if not self._argv:
+            raise FileNotFoundError("runtime not installed")
+        return Worker(self._argv, self.interrupt_signal)
+
+    def warm(self):
+        """Start workers in the background until `size` are idle."""
+        with self._lock:
+            missing = self.size - len(self._idle) - self._starting
+            self._starting += max(0, missing)
+        for _ in range(missing):
+            threading.Thread(target=self._warm_one, daemon=True).start()
+
+    def _warm_one(self):
+        try:
+            worker = self._spawn()
+        except OSError:
+            worker = None
+        with self._lock:
+            self._starting -= 1
+            if worker is not None:
+                self._idle.append(worker)
+
+    def available(self):
+        if self._argv is None:
+            self._argv = self.command() or False
+        return bool(self._argv)
+
+    def _acquire(self):
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive:
+                    return worker
+        return self._spawn()
+
+    def _release(self, worker, reusable):
+        worker.jobs += 1
+        if reusable and worker.alive and worker.jobs < self.max_jobs:
+            with self._lock:
+                self._idle.append(worker)
+            return
+        worker.close()
+        self.warm()
+
+    def compile(self, source, name="-", cwd="", job=None):
+        """
+        Syntax-check `source` without running it.
+        """
+        return self.run(job, source, name=name, cwd=cwd, op="COMPILE")
+
+    def run(self, job, source, name="-", cwd="", timeout=DEFAULT_TIMEOUT, op="RUN", limits=None,
+            output=None, error_output=None):
+        """
+        Run `source` on a warm worker and return a ProcessResult. `job` (a
+        runner.Job, or None) lets the caller stop the snippet with
+        job.cancel(). `limits`, `output` and `error_output` work as in
+        Job.run_process(): the snippet runs under the limits, and its output
+        is streamed into `output` as it arrives instead of being collected
+        in the result.
+        """
+        if job is not None and job.cancelled:
+            return ProcessResult(None, "", "", cancelled=True)
+        worker = self._acquire()
+        done = threading.Event()
+        state = {"cancelled": False, "timed_out": False}
+
+        def watch():
+            deadline = time.monotonic() + timeout + GRACE_SECONDS
+            while not done.wait(POLL_SECONDS):
+                if job is not None and job.cancelled and not state["cancelled"]:
+                    state["cancelled"] = True
+                    worker.interrupt()
+                elif time.monotonic() > deadline:
+                    state["timed_out"] = True
+                    worker.close()
+                    return
+
+        stdout_sink, stderr_sink = output_sinks(output, error_output)
+        started = time.perf_counter()
+        threading.Thread(target=watch, daemon=True).start()
+        try:
+            fields = worker.request(op, source, stdout_sink, stderr_sink, name, cwd, timeout, limits)
+        except (WorkerDied, ValueError):
+            done.set()
+            worker.close()
+            self.warm()
+            return ProcessResult(worker.proc.returncode, "", "", timed_out=state["timed_out"],
+                                 cancelled=state["cancelled"], wall_time=time.perf_counter() - started)
+        done.set()
+
+        returncode, timed_out, output_limited = int(fields[0]), fields[1] == b"1", fields[2] == b"1"
+        self._release(worker, not (timed_out or state["cancelled"] or state["timed_out"]))
+
+        utime, stime, maxrss = (float(value) for value in fields[3:6])
+        return ProcessResult(
+            returncode,
+            stdout_sink.text() if output is None else "",
+            stderr_sink.text() if output is None else "",
+            timed_out=timed_out or state["timed_out"],
+            cancelled=state["cancelled"],
+            output_limited=output_limited,
+            wall_time=time.perf_counter() - started,
+            user_time=utime if utime >= 0 else None,
+            sys_time=stime if stime >= 0 else None,
+            max_rss=int(maxrss) if maxrss >= 0 else None,
+        )
+
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
+
+
+def python_command():
+    # The worker forks per snippet, which Windows can't do.
+    if not hasattr(os, "fork"):
+        return None
+    interpreter = get_registry().path("python")
+    return [interpreter, "-u", PYTHON_WORKER] if interpreter else None
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(language):
+    """The shared pool for "Python" (None for other languages)."""
+    factories = {
+        "Python": lambda: WarmPool(python_command, getattr(signal, "SIGUSR1", None)),
+    }
+    if language not in factories:
+        return None
+    with _pools_lock:
+        if language not in _pools:
+            _pools[language] = factories[language]()
+        return _pools[language]
+
+
+if __name__ == "__main__":
+    import statistics
+    import tempfile
+
+    RUNS = 20
+    snippets = {
+        "Python": 'print("Hello, World!")\n',
+    }
+
+    def cold(language, source, folder):
+        # What CodeEditor did before the pool: probe the interpreter, then start a fresh one.
+        path = os.path.join(folder, "main.py")
+        with open(path, "w") as f:
+            f.write(source)
+        subprocess.run([python_command()[0], "--version"], capture_output=True)
+        return subprocess.run([python_command()[0], path], capture_output=True, text=True).stdout
+
+    def warm(pool, language, source, folder):
+        pool.compile(source)
+        return pool.run(None, source, "-", folder).stdout
+
+    for language, source in snippets.items():
+        pool = get_pool(language)
+        if not pool.available():
+            print(f"{language:7} not installed, skipped")
+            continue
+        with tempfile.TemporaryDirectory() as folder:
+            timings = {}
+            for label, fn in (("cold", lambda: cold(language, source, folder)),
+                              ("warm", lambda: warm(pool, language, source, folder))):
+                if label == "warm":
+                    pool.warm()
+                    fn()
+                samples = []
+                for _ in range(RUNS):
+                    started = time.perf_counter()
+                    output = fn()
+                    samples.append(time.perf_counter() - started)
+                    assert output.strip() == "Hello, World!", output
+                timings[label] = statistics.median(samples)
+            print(f"{language:7} compile+run median of {RUNS}: cold {timings['cold'] * 1000:7.1f} ms, "
+                  f"warm {timings['warm'] * 1000:7.1f} ms ({timings['cold'] / timings['warm']:.1f}x)")
+        pool.shutdown()
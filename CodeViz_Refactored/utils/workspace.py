@@ -0,0 +1,48 @@
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+
+_live = set()
+_lock = threading.Lock()
+
+
+class Workspace:
+    """
+    A private temporary directory for one compile/run job. Artifact names are
+    unique per workspace, so any number of jobs can run side by side. Use it
+    as a context manager, or call cleanup(); anything left over is removed
+    when the app exits.
+    """
+
+    def __init__(self, prefix="codeviz-"):
+        self.path = tempfile.mkdtemp(prefix=prefix)
+        self.name = uuid.uuid4().hex[:12]
+        with _lock:
+            _live.add(self)
+
+    def artifact(self, suffix=""):
+        return os.path.join(self.path, f"{self.name}{suffix}")
+
+    def cleanup(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        with _lock:
+            _live.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+
+def cleanup_all():
+    with _lock:
+        workspaces = list(_live)
+    for workspace in workspaces:
+        workspace.cleanup()
+
+
+atexit.register(cleanup_all)